@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from ..supabase_client import call_postgrest, verify_token_get_user
+from ..jwt_verifier import verify_token_get_user
+from . import service
 
 cart_bp = Blueprint("cart", __name__)
 
@@ -10,10 +11,7 @@ def get_cart():
     user = verify_token_get_user(token)
     if not user:
         return jsonify({"message":"unauthorized"}), 401
-    uid = user.get("id")
-    params = {"select": "id,product_id,quantity,product:products(title,price,image_url)", "user_id": f"eq.{uid}"}
-    items = call_postgrest("cart_items", method="GET", params=params)
-    return jsonify({"items": items})
+    return jsonify(service.get_cart(user.get("id")))
 
 @cart_bp.route("/add", methods=["POST"])
 def add_item():
@@ -25,12 +23,13 @@ def add_item():
     uid = user.get("id")
     data = request.get_json() or {}
     product_id = data.get("product_id")
-    quantity = int(data.get("quantity",1))
     if not product_id:
         return jsonify({"message":"product_id required"}), 400
-    payload = {"user_id": uid, "product_id": product_id, "quantity": quantity}
-    created = call_postgrest("cart_items", method="POST", json=payload)
-    return jsonify({"item": created}), 201
+    try:
+        item = service.add_item(uid, product_id, int(data.get("quantity",1)))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify({"item": item}), 201
 
 @cart_bp.route("/remove", methods=["POST"])
 def remove_item():
@@ -44,6 +43,5 @@ def remove_item():
     item_id = data.get("item_id")
     if not item_id:
         return jsonify({"message":"item_id required"}), 400
-    # delete where id=eq.item_id and user_id=eq.uid
-    call_postgrest(f"cart_items?id=eq.{item_id}&user_id=eq.{uid}", method="DELETE")
+    service.remove_item(uid, item_id)
     return jsonify({"message":"removed"})
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Cart operations for the Supabase app.
+
+Adding a product calls the cart_add_item RPC (supabase_cart.sql), which
+inserts the line or increments its quantity in one statement on the
+(user_id, product_id) unique constraint, so repeated adds never create
+duplicate rows. A cart is read with one embedded query and priced here:
+every line gets a line_total and the cart a subtotal, so clients no
+longer add up raw rows.
+
+Carts are cached per user for CART_CACHE_TTL seconds and dropped on every
+mutation made through this module. The cache is per process; another
+process may serve a cart up to CART_CACHE_TTL seconds old.
+"""
+import os
+import threading
+from cachetools import TTLCache
+from ..postgrest import table
+from ..supabase_client import call_postgrest
+
+MAX_ITEM_QUANTITY = 99  # Same cap as cart_add_item
+
+_carts = TTLCache(maxsize=int(os.getenv("CART_CACHE_SIZE", 10000)), ttl=int(os.getenv("CART_CACHE_TTL", 30)))
+_carts_lock = threading.Lock()
+
+
+def get_cart(user_id: str) -> dict:
+    """{"items": [...], "subtotal", "item_count"} for `user_id`."""
+    with _carts_lock:
+        cart = _carts.get(user_id)
+    if cart is not None:
+        return cart
+
+    rows = (
+        table("cart_items")
+        .select("id,product_id,quantity")
+        .embed("product", "products", "title,price,image_url")
+        .eq("user_id", user_id)
+        .order("id")
+        .get()
+    )
+    items = []
+    subtotal = 0.0
+    item_count = 0
+    for row in rows:
+        product = row.get("product")
+        # A line whose product was deleted stays visible but is not priced
+        line_total = round(float(product["price"] or 0) * row["quantity"], 2) if product else 0.0
+        items.append({**row, "line_total": line_total})
+        subtotal += line_total
+        item_count += row["quantity"]
+    cart = {"items": items, "subtotal": round(subtotal, 2), "item_count": item_count}
+
+    with _carts_lock:
+        _carts[user_id] = cart
+    return cart
+
+
+def add_item(user_id: str, product_id, quantity: int = 1) -> dict:
+    """Add `quantity` of a product to the cart; returns the cart line. Raises ValueError."""
+    if not 1 <= quantity <= MAX_ITEM_QUANTITY:
+        raise ValueError(f"quantity must be between 1 and {MAX_ITEM_QUANTITY}")
+    try:
+        return call_postgrest("rpc/cart_add_item", method="POST", json={
+            "p_user_id": user_id,
+            "p_product_id": product_id,
+            "p_quantity": quantity,
+        })
+    finally:
+        invalidate(user_id)
+
+
+def remove_item(user_id: str, item_id) -> bool:
+    """Remove a line from the user's cart; False if it was not in the cart."""
+    try:
+        return bool(table("cart_items").eq("id", item_id).eq("user_id", user_id).delete())
+    finally:
+        invalidate(user_id)
+
+
+def invalidate(user_id: str):
+    with _carts_lock:
+        _carts.pop(user_id, None)
@@ -0,0 +1,141 @@
+"""
+Local verification of Supabase access tokens.
+
+Checking a token with Supabase's /auth/v1/user costs an HTTP round trip on
+every request. Supabase access tokens are signed JWTs, so they are verified
+here instead:
+- HS256 tokens (legacy JWT secret) against SUPABASE_JWT_SECRET;
+- RS256/ES256 tokens (asymmetric signing keys) against the project's JWKS,
+  cached for SUPABASE_JWKS_TTL seconds. A token signed with an unknown key
+  id refetches the set (at most once every JWKS_MIN_REFRESH seconds), so
+  key rotation is picked up without a restart.
+If a token cannot be checked locally (no secret configured, or the
+cryptography package is missing for asymmetric keys) the remote check is
+used as before.
+
+Locally verified tokens stay valid until they expire even if the session
+is revoked earlier; Supabase access tokens are short-lived (1h by default).
+
+Profile roles are cached per user id for PROFILE_ROLE_CACHE_TTL seconds.
+This app never changes a role (roles are edited in Supabase), so a role
+change takes effect here within PROFILE_ROLE_CACHE_TTL seconds.
+"""
+import os
+import threading
+import time
+import jwt
+from cachetools import TTLCache
+from services import http_client
+from .supabase_client import AUTH_BASE, call_postgrest, verify_token_get_user as fetch_auth_user
+
+JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+JWKS_URL = AUTH_BASE + "/.well-known/jwks.json"
+JWKS_TTL = int(os.getenv("SUPABASE_JWKS_TTL", 600))
+JWKS_MIN_REFRESH = 30  # Unknown key ids must not turn into a JWKS fetch per request
+AUDIENCE = "authenticated"
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+_jwks_lock = threading.Lock()
+_jwks = {"keys": {}, "fetched_at": 0.0, "attempted_at": 0.0}  # keys: kid -> PyJWK
+
+_roles = TTLCache(maxsize=int(os.getenv("PROFILE_ROLE_CACHE_SIZE", 10000)), ttl=int(os.getenv("PROFILE_ROLE_CACHE_TTL", 60)))
+_roles_lock = threading.Lock()
+
+
+class _Unverifiable(Exception):
+    """The token cannot be checked locally; ask Supabase."""
+
+
+def verify_token_get_user(supabase_jwt: str):
+    """
+    The user a Supabase access token belongs to, or None if the token is
+    invalid or expired. Returns the token's user claims in the shape of
+    /auth/v1/user ("id", "email", "role", "app_metadata", "user_metadata").
+    """
+    if not supabase_jwt:
+        return None
+    try:
+        claims = _decode(supabase_jwt)
+    except _Unverifiable:
+        return fetch_auth_user(supabase_jwt)
+    except jwt.PyJWTError:
+        return None
+    return {
+        "id": claims["sub"],
+        "aud": claims.get("aud"),
+        "role": claims.get("role"),
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "app_metadata": claims.get("app_metadata", {}),
+        "user_metadata": claims.get("user_metadata", {}),
+        "is_anonymous": claims.get("is_anonymous", False),
+    }
+
+
+def get_profile_role(uid: str):
+    """The role in public.profiles for `uid` (None without a profile), cached."""
+    with _roles_lock:
+        if uid in _roles:
+            return _roles[uid]
+    rows = call_postgrest("profiles", method="GET", params={"select": "role", "id": f"eq.{uid}"})
+    role = rows[0].get("role") if rows else None
+    with _roles_lock:
+        _roles[uid] = role
+    return role
+
+
+def _decode(token: str) -> dict:
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if not JWT_SECRET:
+            raise _Unverifiable()
+        key = JWT_SECRET
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        if not jwt.algorithms.has_crypto:
+            raise _Unverifiable()
+        key = _signing_key(header.get("kid"))
+    else:
+        raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm {algorithm}")
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=AUDIENCE,
+        options={"require": ["exp", "sub"]},
+        leeway=5,
+    )
+
+
+def _signing_key(kid: str):
+    with _jwks_lock:
+        now = time.time()
+        key = _jwks["keys"].get(kid)
+        if key is not None and now - _jwks["fetched_at"] < JWKS_TTL:
+            return key.key
+        if now - _jwks["attempted_at"] >= JWKS_MIN_REFRESH:
+            _jwks["attempted_at"] = now
+            try:
+                _refresh_jwks()
+            except Exception as e:
+                # Keep serving the cached keys while Supabase is unreachable
+                print(f"JWKS refresh failed: {str(e)}")
+            key = _jwks["keys"].get(kid)
+        if key is None:
+            if not _jwks["keys"]:
+                raise _Unverifiable()
+            raise jwt.InvalidKeyError(f"Unknown signing key {kid}")
+        return key.key
+
+
+def _refresh_jwks():
+    res = http_client.get(JWKS_URL, timeout=10)
+    res.raise_for_status()
+    keys = {}
+    for jwk in res.json().get("keys", []):
+        try:
+            key = jwt.PyJWK.from_dict(jwk)
+        except jwt.PyJWKError:
+            continue
+        keys[key.key_id] = key
+    _jwks.update({"keys": keys, "fetched_at": time.time()})
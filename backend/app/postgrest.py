@@ -0,0 +1,127 @@
+"""
+Small PostgREST query builder on top of postgrest_request.
+
+    table("products").select("id,title").eq("owner", uid).limit(20).count().get()
+    table("products").eq("id", pid).eq("owner", uid).update({"title": "New"})
+
+Filters are sent as query parameters, so values are URL-encoded and cannot
+inject extra filters. Writes ask for `Prefer: return=representation` and
+return the affected rows: a write filtered on the owner doubles as the
+ownership check, and an empty result means nothing matched. Related rows
+are fetched in the same request with embed() (PostgREST resource
+embedding), and count() asks PostgREST for the total row count
+(`Prefer: count=...`) alongside a page of rows.
+"""
+from .supabase_client import postgrest_request
+
+
+class Result(list):
+    """Rows returned by PostgREST; `count` is the total when count() was requested."""
+
+    def __init__(self, rows, count=None):
+        super().__init__(rows or [])
+        self.count = count
+
+
+class Query:
+    def __init__(self, resource: str):
+        self.resource = resource
+        self._columns = "*"
+        self._embeds = []
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+        self._count = None
+
+    def select(self, columns: str = "*"):
+        self._columns = columns
+        return self
+
+    def embed(self, alias: str, resource: str, columns: str = "*"):
+        """Include related rows of `resource` as `alias` (e.g. product:products(title,price))."""
+        self._embeds.append(f"{alias}:{resource}({columns})")
+        return self
+
+    def filter(self, column: str, operator: str, value):
+        self._filters.append((column, f"{operator}.{value}"))
+        return self
+
+    def eq(self, column: str, value):
+        return self.filter(column, "eq", value)
+
+    def in_(self, column: str, values):
+        # Each value is double-quoted so commas, parentheses and dots in it are not list syntax
+        return self.filter(column, "in", "(" + ",".join(_quote(v) for v in values) + ")")
+
+    def order(self, column: str, desc: bool = False):
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def offset(self, offset: int):
+        self._offset = offset
+        return self
+
+    def count(self, method: str = "estimated"):
+        """Also return the total number of matching rows: exact, planned or estimated."""
+        self._count = method
+        return self
+
+    def get(self) -> Result:
+        params = self._params()
+        select = ",".join([self._columns, *self._embeds]) if self._embeds else self._columns
+        params.append(("select", select))
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+        if self._limit is not None:
+            params.append(("limit", self._limit))
+        if self._offset is not None:
+            params.append(("offset", self._offset))
+        prefer = [f"count={self._count}"] if self._count else []
+        return self._send("GET", params, prefer=prefer)
+
+    def insert(self, rows) -> Result:
+        return self._send("POST", [], json=rows, prefer=["return=representation"])
+
+    def update(self, values: dict) -> Result:
+        self._require_filter()
+        return self._send("PATCH", self._params(), json=values, prefer=["return=representation"])
+
+    def delete(self) -> Result:
+        self._require_filter()
+        return self._send("DELETE", self._params(), prefer=["return=representation"])
+
+    def _params(self) -> list:
+        return list(self._filters)
+
+    def _require_filter(self):
+        # PostgREST would apply an unfiltered write to the whole table
+        if not self._filters:
+            raise ValueError(f"Refusing to write to every row of {self.resource}")
+
+    def _send(self, method: str, params: list, json=None, prefer=()) -> Result:
+        headers = {"Prefer": ",".join(prefer)} if prefer else None
+        res = postgrest_request(self.resource, method=method, params=params, json=json, headers=headers)
+        rows = res.json() if res.text else []
+        return Result(rows, _total(res.headers.get("Content-Range")))
+
+
+def table(resource: str) -> Query:
+    return Query(resource)
+
+
+def _quote(value) -> str:
+    """A PostgREST list item: double-quoted, with backslashes and double quotes escaped."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _total(content_range):
+    # "0-19/1234", "*/0" or "0-19/*" when no count was requested
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
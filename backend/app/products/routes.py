@@ -1,17 +1,38 @@
 from flask import Blueprint, request, jsonify
-from ..supabase_client import call_postgrest, verify_token_get_user, upload_file_to_storage
+from ..supabase_client import call_postgrest, upload_file_to_storage
+from ..jwt_verifier import get_profile_role, verify_token_get_user
+from ..postgrest import table
 import uuid
 
+MAX_PAGE_SIZE = 100
+
 products_bp = Blueprint("products", __name__)
 
 @products_bp.route("/", methods=["GET"])
 def list_products():
-    rows = call_postgrest("products", method="GET", params={"select":"*"})
-    return jsonify(rows)
+    """
+    List products. With ?limit= (max 100) and optional ?offset= only that page
+    is returned and X-Total-Count carries PostgREST's estimated total.
+    """
+    query = table("products").select("*")
+    if "limit" not in request.args:
+        return jsonify(query.get())
+    try:
+        limit = min(int(request.args["limit"]), MAX_PAGE_SIZE)
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"message":"limit and offset must be integers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"message":"limit must be positive and offset not negative"}), 400
+    rows = query.order("id").limit(limit).offset(offset).count("estimated").get()
+    response = jsonify(rows)
+    if rows.count is not None:
+        response.headers["X-Total-Count"] = str(rows.count)
+    return response
 
 @products_bp.route("/<product_id>", methods=["GET"])
 def get_product(product_id):
-    row = call_postgrest("products", method="GET", params={"select":"*", "id": f"eq.{product_id}"})
+    row = table("products").select("*").eq("id", product_id).get()
     if not row:
         return jsonify({"message":"not found"}), 404
     return jsonify(row[0])
@@ -25,8 +46,7 @@ def create_product():
         return jsonify({"message":"unauthorized"}), 401
     
     uid = user.get("id")
-    prof = call_postgrest("profiles", method="GET", params={"select":"role,id", "id": f"eq.{uid}"})
-    if not prof or prof[0].get("role") not in ("designer","admin"):
+    if get_profile_role(uid) not in ("designer","admin"):
         return jsonify({"message":"forbidden"}), 403
     
     # Handle multipart form data (file upload)
@@ -81,13 +101,11 @@ def edit_product(product_id):
     if not user:
         return jsonify({"message":"unauthorized"}), 401
     
-    # Check ownership
-    existing = call_postgrest("products", method="GET", params={"select":"owner", "id": f"eq.{product_id}"})
-    if not existing or existing[0].get("owner") != user.get("id"):
-        return jsonify({"message":"forbidden"}), 403
-    
+    # Filtering on the owner makes the update its own ownership check
     data = request.get_json() or {}
-    updated = call_postgrest(f"products?id=eq.{product_id}", method="PATCH", json=data)
+    updated = table("products").eq("id", product_id).eq("owner", user.get("id")).update(data)
+    if not updated:
+        return jsonify({"message":"forbidden"}), 403
     return jsonify(updated)
 
 @products_bp.route("/<product_id>", methods=["DELETE"])
@@ -98,9 +116,7 @@ def delete_product(product_id):
     if not user:
         return jsonify({"message":"unauthorized"}), 401
     
-    existing = call_postgrest("products", method="GET", params={"select":"owner", "id": f"eq.{product_id}"})
-    if not existing or existing[0].get("owner") != user.get("id"):
+    deleted = table("products").eq("id", product_id).eq("owner", user.get("id")).delete()
+    if not deleted:
         return jsonify({"message":"forbidden"}), 403
-    
-    call_postgrest(f"products?id=eq.{product_id}", method="DELETE")
     return jsonify({"message":"deleted"}), 200
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os
+import httpx
 import requests
 from dotenv import load_dotenv
+from services import http_client
 
 load_dotenv()
 
@@ -29,10 +31,16 @@ HEADERS_ANON = {
 }
 
 def _req_raise(res: requests.Response):
+    _raise_for_status(res)
+    return _body(res)
+
+def _raise_for_status(res: requests.Response):
     if not res.ok:
         http_error = requests.HTTPError(f"{res.status_code} {res.reason}")
         http_error.response = res
         raise http_error
+
+def _body(res: requests.Response):
     if res.text:
         try:
             return res.json()
@@ -40,17 +48,23 @@ def _req_raise(res: requests.Response):
             return res.text
     return None
 
-def call_postgrest(path: str, method: str = "GET", params: dict | None = None, json: dict | None = None):
+def postgrest_request(path: str, method: str = "GET", params: dict | None = None, json=None, headers: dict | None = None) -> requests.Response:
+    """Raw PostgREST call with the service role; raises requests.HTTPError on failure."""
     url = f"{REST_BASE}/{path}"
-    res = requests.request(method, url, headers=HEADERS_SERVICE, params=params, json=json, timeout=30)
-    return _req_raise(res)
+    res = http_client.request(method, url, headers={**HEADERS_SERVICE, **(headers or {})}, params=params, json=json, timeout=30)
+    _raise_for_status(res)
+    return res
+
+def call_postgrest(path: str, method: str = "GET", params: dict | None = None, json=None, headers: dict | None = None):
+    res = postgrest_request(path, method=method, params=params, json=json, headers=headers)
+    return _body(res)
 
 def verify_token_get_user(supabase_jwt: str):
     if not supabase_jwt:
         return None
     url = f"{AUTH_BASE}/user"
     headers = {"Authorization": f"Bearer {supabase_jwt}", "apikey": ANON_KEY or SERVICE_ROLE_KEY}
-    res = requests.get(url, headers=headers, timeout=10)
+    res = http_client.get(url, headers=headers, timeout=10)
     if res.status_code != 200:
         return None
     return res.json()
@@ -62,32 +76,48 @@ def admin_create_user(email: str, password: str, user_metadata: dict | None = No
         payload["user_metadata"] = user_metadata
     if auto_confirm:
         payload["email_confirm"] = True
-    res = requests.post(url, headers=HEADERS_SERVICE, json=payload, timeout=15)
+    res = http_client.post(url, headers=HEADERS_SERVICE, json=payload, timeout=15)
     return _req_raise(res)
 
 def login_user(email: str, password: str):
     url = f"{AUTH_BASE}/token?grant_type=password"
     payload = {"email": email, "password": password}
-    res = requests.post(url, headers=HEADERS_ANON, json=payload, timeout=15)
+    res = http_client.post(url, headers=HEADERS_ANON, json=payload, timeout=15)
     return _req_raise(res)
 
-def upload_file_to_storage(bucket: str, path: str, file_data: bytes, content_type: str = "image/png"):
-    """
-    Upload file to Supabase Storage.
-    Returns the public URL of the uploaded file.
-    """
+def _storage_upload(bucket: str, path: str, content_type: str):
     url = f"{STORAGE_BASE}/object/{bucket}/{path}"
     headers = {
         "apikey": SERVICE_ROLE_KEY,
         "Authorization": f"Bearer {SERVICE_ROLE_KEY}",
         "Content-Type": content_type,
     }
-    res = requests.post(url, headers=headers, data=file_data, timeout=30)
+    public_url = f"{SUPABASE_URL}/storage/v1/object/public/{bucket}/{path}"
+    return url, headers, public_url
+
+def upload_file_to_storage(bucket: str, path: str, file_data: bytes, content_type: str = "image/png"):
+    """
+    Upload file to Supabase Storage.
+    Returns the public URL of the uploaded file.
+    """
+    url, headers, public_url = _storage_upload(bucket, path, content_type)
+    res = http_client.post(url, headers=headers, data=file_data, timeout=30)
     _req_raise(res)
-    # Return public URL
-    return f"{SUPABASE_URL}/storage/v1/object/public/{bucket}/{path}"
+    return public_url
+
+async def upload_file_to_storage_async(client: httpx.AsyncClient, bucket: str, path: str, file_data, content_type: str = "image/png"):
+    """
+    Upload file to Supabase Storage from an event loop.
+    `file_data` may be bytes or an async iterator of chunks, which is streamed
+    with chunked transfer encoding. Returns the public URL of the uploaded file;
+    raises httpx.HTTPStatusError on failure.
+    """
+    url, headers, public_url = _storage_upload(bucket, path, content_type)
+    res = await client.post(url, headers=headers, content=file_data, timeout=httpx.Timeout(60, connect=5))
+    res.raise_for_status()  # httpx.HTTPStatusError
+    return public_url
 
 def create_signed_upload_url(bucket: str, path: str, expires_in: int = 3600):
     url = f"{STORAGE_BASE}/object/sign/{bucket}/{path}"
-    res = requests.post(url, headers=HEADERS_SERVICE, json={"expires_in": expires_in}, timeout=10)
+    res = http_client.post(url, headers=HEADERS_SERVICE, json={"expires_in": expires_in}, timeout=10)
     return _req_raise(res)
\ No newline at end of file
@@ -1,9 +1,9 @@
-import os
-from flask import Blueprint, request, jsonify, current_app
-import requests
-from ..supabase_client import verify_token_get_user, call_postgrest, upload_file_to_storage
-from .tryon_service import generate_tryon
-import asyncio
+from flask import Blueprint, request, jsonify
+from ..jwt_verifier import verify_token_get_user
+from ..postgrest import table
+from .tryon_service import generate_tryon, run as run_async
+from services import garment_store, image_pipeline
+from PIL import UnidentifiedImageError
 import uuid
 
 tryon_bp = Blueprint("tryon", __name__)
@@ -17,30 +17,46 @@ def create_tryon():
     if not user:
         return jsonify({"message": "unauthorized"}), 401
     
-    # Get files
-    if "user_photo" not in request.files or "product_image" not in request.files:
-        return jsonify({"message": "user_photo and product_image required"}), 400
+    # Get files; the garment may be uploaded or given as a product id whose image is looked up here
+    product_id = request.form.get("product_id")
+    if "user_photo" not in request.files or ("product_image" not in request.files and not product_id):
+        return jsonify({"message": "user_photo and product_image (or product_id) required"}), 400
     
     user_photo_file = request.files["user_photo"]
-    product_image_file = request.files["product_image"]
     product_name = request.form.get("product_name", "compression shirt")
     
+    product_image_url = None
+    if "product_image" not in request.files:
+        product = table("products").select("title,image_url").eq("id", product_id).get()
+        if not product or not product[0].get("image_url"):
+            return jsonify({"message": "product not found"}), 404
+        product_image_url = product[0]["image_url"]
+        product_name = request.form.get("product_name") or product[0].get("title") or product_name
+    
     try:
         # Read image bytes
         user_photo = user_photo_file.read()
-        product_image = product_image_file.read()
-        
-        # Generate try-on image using FASHN API
-        result_image = asyncio.run(generate_tryon(user_photo, product_image, product_name))
+        if product_image_url is None:
+            product_image = request.files["product_image"].read()
+        else:
+            try:
+                product_image = garment_store.load_image(product_image_url)
+            except garment_store.ImageRefError as e:
+                return jsonify({"message": str(e)}), 400
+        try:
+            user_photo, product_image, _ = image_pipeline.normalize_pair(user_photo, product_image)
+        except UnidentifiedImageError:
+            return jsonify({"message": "user_photo and product_image must be valid images"}), 400
         
-        # Upload result to storage
-        filename = f"tryon_{uuid.uuid4()}.jpg"
-        public_url = upload_file_to_storage(
+        # Generate try-on image using FASHN API; the result is streamed into storage
+        filename = f"tryon_{uuid.uuid4()}.png"
+        public_url = run_async(generate_tryon(
+            user_photo,
+            product_image,
+            product_name,
             bucket="tryon-results",
-            path=filename,
-            file_data=result_image,
-            content_type="image/jpeg"
-        )
+            path=filename
+        ))
         
         # Save try-on record to database (optional)
         tryon_record = {
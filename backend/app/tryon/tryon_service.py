@@ -1,15 +1,25 @@
+import asyncio
 import base64
-import io
+import concurrent.futures
 import os
-import time
+import threading
 import traceback
-import requests
+import httpx
+from ..supabase_client import upload_file_to_storage_async
 
 FASHN_API_KEY = os.getenv("FASHN_API_KEY")
 if not FASHN_API_KEY:
     raise RuntimeError("FASHN_API_KEY not set in .env")
 
 FASHN_API_BASE = "https://api.fashn.ai/v1"
+RUN_TIMEOUT = 240  # Covers generate_tryon's 2 minutes of polling plus the result upload
+
+# One event loop per process, run on a background thread. Request handlers
+# hand their coroutines to it with run(), so concurrent try-ons share the
+# loop and the AsyncClient connection pool instead of each starting a loop.
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
 
 
 def base64_to_image(base64_str: str) -> bytes:
@@ -20,10 +30,37 @@ def image_to_base64(image_data: bytes) -> str:
     """Convert image bytes to base64 string."""
     return base64.b64encode(image_data).decode("utf-8")
 
-async def generate_tryon(user_photo: bytes, product_image: bytes, product_name: str) -> bytes:
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _client
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tryon-event-loop", daemon=True).start()
+            _client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=httpx.Timeout(30, connect=5)
+            )
+        return _loop
+
+def run(coro, timeout: float = RUN_TIMEOUT):
+    """
+    Run a coroutine on the shared try-on loop and block the calling thread for
+    its result. After `timeout` seconds the coroutine is cancelled and
+    TimeoutError is raised, so a stuck call cannot pin the worker thread.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Try-on did not finish within {timeout} seconds")
+
+async def generate_tryon(user_photo: bytes, product_image: bytes, product_name: str, bucket: str, path: str) -> str:
     """
     Use FASHN Virtual Try-On v1.6 API to generate realistic try-on image.
-    Returns resulting image as bytes.
+    The result is streamed from FASHN straight into Supabase Storage at
+    bucket/path. Returns the public URL of the stored image.
+    Must run on the shared loop (see run()).
     """
     try:
         # Convert bytes to base64 with proper prefix
@@ -49,10 +86,11 @@ async def generate_tryon(user_photo: bytes, product_image: bytes, product_name:
         
         # Submit request
         print("Submitting try-on request to FASHN API...")
-        response = requests.post(
+        response = await _client.post(
             f"{FASHN_API_BASE}/run",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=httpx.Timeout(60, connect=5)
         )
         
         if response.status_code != 200:
@@ -72,10 +110,10 @@ async def generate_tryon(user_photo: bytes, product_image: bytes, product_name:
         attempt = 0
         
         while attempt < max_attempts:
-            time.sleep(2)  # Wait 2 seconds between polls
+            await asyncio.sleep(2)  # Yields the loop to other try-ons between polls
             attempt += 1
             
-            status_response = requests.get(status_url, headers=headers)
+            status_response = await _client.get(status_url, headers=headers, timeout=httpx.Timeout(15, connect=5))
             
             if status_response.status_code != 200:
                 raise Exception(f"Status check failed: {status_response.status_code}")
@@ -90,15 +128,21 @@ async def generate_tryon(user_photo: bytes, product_image: bytes, product_name:
                 if not output or len(output) == 0:
                     raise Exception("No output image URL returned")
                 
-                # Download the result image
+                # Stream the result image into storage without buffering it
                 image_url = output[0]
-                print(f"Downloading result from: {image_url}")
-                
-                image_response = requests.get(image_url)
-                if image_response.status_code != 200:
-                    raise Exception(f"Failed to download result image: {image_response.status_code}")
+                print(f"Streaming result from: {image_url}")
                 
-                return image_response.content
+                async with _client.stream("GET", image_url) as image_response:
+                    if image_response.status_code != 200:
+                        raise Exception(f"Failed to download result image: {image_response.status_code}")
+                    content_type = image_response.headers.get("Content-Type", "image/png")
+                    return await upload_file_to_storage_async(
+                        _client,
+                        bucket=bucket,
+                        path=path,
+                        file_data=image_response.aiter_bytes(),
+                        content_type=content_type
+                    )
             
             elif status == "failed":
                 error = status_result.get("error", "Unknown error")
@@ -111,4 +155,4 @@ async def generate_tryon(user_photo: bytes, product_image: bytes, product_name:
     except Exception as e:
         print(f"ERROR in generate_tryon: {str(e)}")
         traceback.print_exc()
-        raise Exception(f"FASHN try-on failed: {str(e)}")
\ No newline at end of file
+        raise Exception(f"FASHN try-on failed: {str(e)}")
@@ -18,6 +18,46 @@ class Config:
     FASHN_API_KEY = os.getenv("FASHN_API_KEY")
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max
+    TRYON_JOB_FOLDER = os.path.join(UPLOAD_FOLDER, 'tryon_jobs')  # Job inputs kept until the job finishes
+    GARMENT_CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'garments')  # Local copies of product images
+    GARMENT_REVALIDATE_SECONDS = int(os.getenv("GARMENT_REVALIDATE_SECONDS", 3600))
+    GARMENT_CACHE_MAX_BYTES = int(os.getenv("GARMENT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    GARMENT_ALLOWED_HOSTS = os.getenv("GARMENT_ALLOWED_HOSTS", "images.unsplash.com")  # Comma-separated; R2 and Supabase hosts are always allowed
+    GARMENT_FETCH_TIMEOUT = int(os.getenv("GARMENT_FETCH_TIMEOUT", 15))
+    TRYON_MAX_IMAGE_SIDE = int(os.getenv("TRYON_MAX_IMAGE_SIDE", 1536))  # Longest side sent to FASHN
+    TRYON_JPEG_QUALITY = int(os.getenv("TRYON_JPEG_QUALITY", 90))
+    TRYON_IMAGE_WORKERS = int(os.getenv("TRYON_IMAGE_WORKERS", 2))
+    TRYON_WORKERS = int(os.getenv("TRYON_WORKERS", 4))
+    TRYON_JOB_LEASE_SECONDS = int(os.getenv("TRYON_JOB_LEASE_SECONDS", 60))
+    TRYON_JOB_MAX_ATTEMPTS = int(os.getenv("TRYON_JOB_MAX_ATTEMPTS", 3))
+    TRYON_POLL_TIMEOUT_SECONDS = int(os.getenv("TRYON_POLL_TIMEOUT_SECONDS", 120))
+    TRYON_CACHE_TTL_SECONDS = int(os.getenv("TRYON_CACHE_TTL_SECONDS", 60 * 3600))  # Capped below the 72h FASHN CDN URL lifetime
+    TRYON_CACHE_MAX_ENTRIES = int(os.getenv("TRYON_CACHE_MAX_ENTRIES", 5000))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 20))  # Keep-alive connections per upstream host
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))  # Idempotent requests only
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", 0.5))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+    CATALOG_CACHE_BACKEND = os.getenv("CATALOG_CACHE_BACKEND", "memory")  # memory or redis
+    CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 300))
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))  # Changing it rehashes passwords on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 8))  # Hashes allowed to wait before returning 429
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))  # Reverse proxies in front of the app that set X-Forwarded-For
+    LOGIN_LIMIT_BACKEND = os.getenv("LOGIN_LIMIT_BACKEND", "memory")  # memory or redis
+    LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 20))  # Attempts per client IP before throttling
+    LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", 10))
+    LOGIN_EMAIL_BURST = int(os.getenv("LOGIN_EMAIL_BURST", 5))  # Attempts per account before throttling
+    LOGIN_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_EMAIL_PER_MINUTE", 1))
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 60))  # Seconds a user's (role, name) is reused across requests
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+    ADMIN_STATS_TTL = int(os.getenv("ADMIN_STATS_TTL", 30))  # Seconds before the dashboard snapshot is refreshed
+    DESIGNER_COMMISSION = 0.05  # Share of a designer product's sale price credited to the designer
+    BACKGROUND_TASKS = os.getenv("BACKGROUND_TASKS", "true").lower() in ("1", "true", "yes")  # Sweeper threads, started by the first request
+    INVENTORY_HOLD_SECONDS = int(os.getenv("INVENTORY_HOLD_SECONDS", 600))  # How long checkout holds stock
+    INVENTORY_SWEEP_SECONDS = int(os.getenv("INVENTORY_SWEEP_SECONDS", 30))
+    INVENTORY_DEFAULT_SHARDS = int(os.getenv("INVENTORY_DEFAULT_SHARDS", 8))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     R2_ENDPOINT = os.getenv("R2_ENDPOINT")
     R2_ACCOUNT_ID = os.getenv("R2_ACCOUNT_ID")
     R2_BUCKET = os.getenv("R2_BUCKET")
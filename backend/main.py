@@ -1,8 +1,8 @@
-import json
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
 from models import db, bcrypt, User, Product
 
@@ -10,6 +10,11 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    if Config.TRUSTED_PROXY_HOPS:
+        # Take the client address from X-Forwarded-* set by our own proxies only
+        hops = Config.TRUSTED_PROXY_HOPS
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    
     # Initialize extensions
     db.init_app(app)
     bcrypt.init_app(app)
@@ -28,6 +33,7 @@ def create_app():
     from routes.tryon import tryon_bp
     from routes.uploads import uploads_bp
     from routes.custom_designs import custom_designs_bp
+    from routes.inventory import inventory_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(products_bp)
@@ -38,6 +44,16 @@ def create_app():
     app.register_blueprint(tryon_bp)
     app.register_blueprint(uploads_bp)
     app.register_blueprint(custom_designs_bp)
+    app.register_blueprint(inventory_bp)
+    
+    # Start background try-on workers
+    from services import tryon_jobs
+    tryon_jobs.init_app(app)
+    
+    from services import product_search, inventory, sales_rollup
+    product_search.init_app(app)
+    inventory.init_app(app)
+    sales_rollup.init_app(app)
     
     # with app.app_context():
     #     print("Dropping all tables...")
@@ -216,8 +232,8 @@ def seed_database():
             category=p_data['category'],
             description=p_data['description'],
             image=p_data['image'],
-            sizes=json.dumps(p_data['sizes']),
-            colors=json.dumps(p_data['colors']),
+            sizes=p_data['sizes'],
+            colors=p_data['colors'],
             designer_id=p_data.get('designer_id'),
             designer_name=p_data.get('designer_name'),
             is_featured=p_data.get('is_featured', False),
@@ -0,0 +1,45 @@
+"""try-on job state
+
+Revision ID: 3f1c2a7d9b10
+Revises: 88ea1e30e78c
+Create Date: 2026-10-16 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b10'
+down_revision = '88ea1e30e78c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('custom_design_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('product_name', sa.String(length=200), nullable=True))
+        # Rows created before the job queue were generated synchronously
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=True, server_default='completed'))
+        batch_op.add_column(sa.Column('prediction_id', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=True, server_default='0'))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_try_ons_status'), ['status'], unique=False)
+        batch_op.create_foreign_key('fk_try_ons_custom_design_id', 'custom_designs', ['custom_design_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_try_ons_custom_design_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_try_ons_status'))
+        batch_op.drop_column('completed_at')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('error')
+        batch_op.drop_column('prediction_id')
+        batch_op.drop_column('status')
+        batch_op.drop_column('product_name')
+        batch_op.drop_column('custom_design_id')
@@ -0,0 +1,28 @@
+"""try-on submission time and timings
+
+Revision ID: 5be03d8a6f24
+Revises: c2d97f41e083
+Create Date: 2026-10-16 16:22:09.874120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5be03d8a6f24'
+down_revision = 'c2d97f41e083'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('submitted_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('timings', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.drop_column('timings')
+        batch_op.drop_column('submitted_at')
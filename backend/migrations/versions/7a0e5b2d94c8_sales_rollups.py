@@ -0,0 +1,63 @@
+"""daily sales rollups
+
+Revision ID: 7a0e5b2d94c8
+Revises: f2c6e8a40b93
+Create Date: 2026-10-19 11:08:23.460135
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a0e5b2d94c8'
+down_revision = 'f2c6e8a40b93'
+branch_labels = None
+depends_on = None
+
+DESIGNER_COMMISSION = 0.05
+
+
+def upgrade():
+    op.create_table('sales_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('designer_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('delivered_units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('commission', sa.Float(), nullable=False),
+    sa.Column('delivered_commission', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['designer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('designer_id', 'day', 'product_id', name='uq_sales_rollups_designer_day_product')
+    )
+    with op.batch_alter_table('sales_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_sales_rollups_product_id_day', ['product_id', 'day'], unique=False)
+
+    # Backfill from the order history (same as `flask rollups rebuild`)
+    op.execute(f"""
+        INSERT INTO sales_rollups (day, designer_id, product_id, units, delivered_units, revenue, commission,
+                                    delivered_commission)
+        SELECT date(orders.created_at), order_items.designer_id, order_items.product_id,
+               sum(CASE WHEN orders.status != 'cancelled' THEN order_items.quantity ELSE 0 END),
+               sum(CASE WHEN orders.status = 'delivered' THEN order_items.quantity ELSE 0 END),
+               sum(CASE WHEN orders.status != 'cancelled' THEN order_items.unit_price * order_items.quantity ELSE 0 END),
+               sum(CASE WHEN orders.status != 'cancelled'
+                        THEN order_items.unit_price * order_items.quantity * {DESIGNER_COMMISSION} ELSE 0 END),
+               sum(CASE WHEN orders.status = 'delivered'
+                        THEN order_items.unit_price * order_items.quantity * {DESIGNER_COMMISSION} ELSE 0 END)
+        FROM order_items JOIN orders ON orders.id = order_items.order_id
+        WHERE order_items.designer_id IS NOT NULL AND order_items.product_id IS NOT NULL
+          AND orders.created_at IS NOT NULL
+        GROUP BY date(orders.created_at), order_items.designer_id, order_items.product_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('sales_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_sales_rollups_product_id_day')
+
+    op.drop_table('sales_rollups')
@@ -0,0 +1,50 @@
+"""product json columns
+
+Revision ID: 9d3b7e52c1a4
+Revises: e71a4c90b3f5
+Create Date: 2026-10-17 14:05:18.203917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b7e52c1a4'
+down_revision = 'e71a4c90b3f5'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = ('images', 'sizes', 'colors')
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Empty or missing lists become [] so the containment filters see an array
+        for column in JSON_COLUMNS:
+            op.execute(
+                f"ALTER TABLE products ALTER COLUMN {column} TYPE JSONB "
+                f"USING COALESCE(NULLIF({column}, ''), '[]')::jsonb"
+            )
+        op.create_index('ix_products_sizes', 'products', ['sizes'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'sizes': 'jsonb_path_ops'})
+        op.create_index('ix_products_colors', 'products', ['colors'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'colors': 'jsonb_path_ops'})
+    else:
+        # SQLite stores JSON as text already; only the declared type changes
+        with op.batch_alter_table('products', schema=None) as batch_op:
+            for column in JSON_COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.Text(), type_=sa.JSON())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_products_colors', table_name='products', postgresql_using='gin')
+        op.drop_index('ix_products_sizes', table_name='products', postgresql_using='gin')
+        for column in JSON_COLUMNS:
+            op.execute(f"ALTER TABLE products ALTER COLUMN {column} TYPE TEXT USING {column}::text")
+    else:
+        with op.batch_alter_table('products', schema=None) as batch_op:
+            for column in JSON_COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.JSON(), type_=sa.Text())
@@ -0,0 +1,45 @@
+"""try-on result cache
+
+Revision ID: a84e6b2c51d7
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-16 11:40:03.562917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a84e6b2c51d7'
+down_revision = '3f1c2a7d9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tryon_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('cdn_url', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.Column('hit_count', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tryon_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tryon_cache_cache_key'), ['cache_key'], unique=True)
+        batch_op.create_index(batch_op.f('ix_tryon_cache_last_used_at'), ['last_used_at'], unique=False)
+
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cache_key', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.drop_column('cache_key')
+
+    with op.batch_alter_table('tryon_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tryon_cache_last_used_at'))
+        batch_op.drop_index(batch_op.f('ix_tryon_cache_cache_key'))
+
+    op.drop_table('tryon_cache')
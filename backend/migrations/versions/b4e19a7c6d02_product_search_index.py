@@ -0,0 +1,69 @@
+"""product full-text search index
+
+Revision ID: b4e19a7c6d02
+Revises: 9d3b7e52c1a4
+Create Date: 2026-10-17 16:42:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e19a7c6d02'
+down_revision = '9d3b7e52c1a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            ALTER TABLE products ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(designer_name, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            ) STORED
+        """)
+        op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False,
+                        postgresql_using='gin')
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                name, designer_name, description,
+                content='products', content_rowid='id', tokenize='porter unicode61'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, name, designer_name, description)
+                VALUES (new.id, new.name, new.designer_name, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, designer_name, description)
+                VALUES ('delete', old.id, old.name, old.designer_name, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_au AFTER UPDATE OF name, designer_name, description ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, designer_name, description)
+                VALUES ('delete', old.id, old.name, old.designer_name, old.description);
+                INSERT INTO products_fts(rowid, name, designer_name, description)
+                VALUES (new.id, new.name, new.designer_name, new.description);
+            END
+        """)
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_products_search_vector', table_name='products', postgresql_using='gin')
+        op.drop_column('products', 'search_vector')
+    elif op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,26 @@
+"""try-on bytes saved by normalization
+
+Revision ID: c2d97f41e083
+Revises: a84e6b2c51d7
+Create Date: 2026-10-16 14:05:27.301448
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d97f41e083'
+down_revision = 'a84e6b2c51d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bytes_saved', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('try_ons', schema=None) as batch_op:
+        batch_op.drop_column('bytes_saved')
@@ -0,0 +1,62 @@
+"""inventory reservations and stock shards
+
+Revision ID: d5a8c3f19e76
+Revises: b4e19a7c6d02
+Create Date: 2026-10-18 10:12:44.381026
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8c3f19e76'
+down_revision = 'b4e19a7c6d02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('inventory_holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reservation_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('inventory_holds', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_inventory_holds_reservation_id'), ['reservation_id'], unique=False)
+        batch_op.create_index('ix_inventory_holds_status_expires_at', ['status', 'expires_at'], unique=False)
+
+    op.create_table('product_stock_shards',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'shard')
+    )
+
+    # Plain ADD COLUMN (no table rebuild on SQLite, so the search triggers survive)
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stock_shards', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('stock_shards')
+
+    op.drop_table('product_stock_shards')
+    with op.batch_alter_table('inventory_holds', schema=None) as batch_op:
+        batch_op.drop_index('ix_inventory_holds_status_expires_at')
+        batch_op.drop_index(batch_op.f('ix_inventory_holds_reservation_id'))
+
+    op.drop_table('inventory_holds')
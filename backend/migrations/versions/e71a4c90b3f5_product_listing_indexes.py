@@ -0,0 +1,34 @@
+"""product listing indexes
+
+Revision ID: e71a4c90b3f5
+Revises: 5be03d8a6f24
+Create Date: 2026-10-17 09:31:52.640713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e71a4c90b3f5'
+down_revision = '5be03d8a6f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_listing', ['is_active', 'is_deleted', 'category', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_listing_newest', ['is_active', 'is_deleted', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_listing_price', ['is_active', 'is_deleted', 'price', 'id'], unique=False)
+        batch_op.create_index('ix_products_listing_featured', ['is_active', 'is_deleted', 'is_featured', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_listing_new', ['is_active', 'is_deleted', 'is_new', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_listing_new')
+        batch_op.drop_index('ix_products_listing_featured')
+        batch_op.drop_index('ix_products_listing_price')
+        batch_op.drop_index('ix_products_listing_newest')
+        batch_op.drop_index('ix_products_listing')
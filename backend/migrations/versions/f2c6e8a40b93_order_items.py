@@ -0,0 +1,116 @@
+"""order line items
+
+Revision ID: f2c6e8a40b93
+Revises: d5a8c3f19e76
+Create Date: 2026-10-18 15:37:06.914552
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6e8a40b93'
+down_revision = 'd5a8c3f19e76'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 500
+
+orders = sa.table('orders', sa.column('id', sa.Integer), sa.column('items', sa.Text))
+products = sa.table(
+    'products',
+    sa.column('id', sa.Integer), sa.column('price', sa.Float), sa.column('designer_id', sa.Integer)
+)
+designs = sa.table('designs', sa.column('id', sa.Integer), sa.column('product_id', sa.Integer))
+order_items = sa.table(
+    'order_items',
+    sa.column('order_id', sa.Integer), sa.column('product_id', sa.Integer),
+    sa.column('design_id', sa.Integer), sa.column('designer_id', sa.Integer),
+    sa.column('unit_price', sa.Float), sa.column('quantity', sa.Integer)
+)
+
+
+def upgrade():
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('design_id', sa.Integer(), nullable=True),
+    sa.Column('designer_id', sa.Integer(), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['design_id'], ['designs.id'], ),
+    sa.ForeignKeyConstraint(['designer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_design_id'), ['design_id'], unique=False)
+        batch_op.create_index('ix_order_items_product_id_order_id', ['product_id', 'order_id'], unique=False)
+        batch_op.create_index('ix_order_items_designer_id_order_id', ['designer_id', 'order_id'], unique=False)
+
+    _backfill()
+
+
+def _backfill():
+    """Explode every order's JSON items into order_items, a chunk of orders at a time."""
+    bind = op.get_bind()
+    product_rows = {row.id: row for row in bind.execute(sa.select(products))}
+    design_by_product = {
+        row.product_id: row.id
+        for row in bind.execute(sa.select(designs.c.id, designs.c.product_id).where(designs.c.product_id.isnot(None)))
+    }
+
+    last_id = 0
+    while True:
+        chunk = bind.execute(
+            sa.select(orders.c.id, orders.c['items'])
+            .where(orders.c.id > last_id)
+            .order_by(orders.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).all()
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        rows = []
+        for order in chunk:
+            try:
+                items = json.loads(order.items) if order.items else []
+            except (ValueError, TypeError):
+                continue
+            for item in items:
+                try:
+                    product_id = int(item.get('productId') or item.get('id'))
+                    quantity = int(item.get('quantity', 1))
+                except (TypeError, ValueError):
+                    continue
+                product = product_rows.get(product_id)
+                # Keep the price the customer saw; fall back to the catalog price
+                unit_price = item.get('price', product.price if product else None)
+                if unit_price is None:
+                    continue
+                rows.append({
+                    'order_id': order.id,
+                    'product_id': product_id if product else None,
+                    'design_id': design_by_product.get(product_id),
+                    'designer_id': product.designer_id if product else None,
+                    'unit_price': float(unit_price),
+                    'quantity': quantity
+                })
+        if rows:
+            bind.execute(order_items.insert(), rows)
+
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_items_designer_id_order_id')
+        batch_op.drop_index('ix_order_items_product_id_order_id')
+        batch_op.drop_index(batch_op.f('ix_order_items_design_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    op.drop_table('order_items')
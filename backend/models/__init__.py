@@ -8,6 +8,10 @@ from .user import User
 from .product import Product
 from .design import Design
 from .order import Order
+from .order_item import OrderItem
 from .transaction import Transaction
 from .tryon import TryOn
+from .tryon_cache import TryOnCache
 from .custom_design import CustomDesign
+from .inventory import InventoryHold, ProductStockShard
+from .sales_rollup import SalesRollup
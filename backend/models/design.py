@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import inspect
 from . import db
 
 class Design(db.Model):
@@ -19,13 +20,26 @@ class Design(db.Model):
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=True)  # Link to created product
     is_deleted = db.Column(db.Boolean, default=False)
     
-    def to_dict(self):
+    @classmethod
+    def serialize_many(cls, designs):
+        """to_dict() for a list of designs, resolving designer names in one query instead of one per design."""
+        from .user import User
+        unloaded = {d.designer_id for d in designs if 'designer' in inspect(d).unloaded}
+        names = dict(
+            db.session.query(User.id, User.name).filter(User.id.in_(unloaded)).all()
+        ) if unloaded else {}
+        return [d.to_dict(designer_name=names.get(d.designer_id)) for d in designs]
+    
+    def to_dict(self, designer_name=None):
+        """Serialize the design; pass `designer_name` when it is already known to skip loading the designer."""
+        if designer_name is None:
+            designer_name = self.designer.name if self.designer else None
         return {
             'id': f'DES-{self.id:03d}',
             'numericId': self.id,
             'name': self.name,
             'designerId': str(self.designer_id),
-            'designerName': self.designer.name if self.designer else None,
+            'designerName': designer_name,
             'image': self.image,
             'category': self.category,
             'status': self.status,
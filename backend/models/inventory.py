@@ -0,0 +1,31 @@
+from datetime import datetime
+from . import db
+
+class InventoryHold(db.Model):
+    """Stock set aside for a checkout; one row per product (and shard) in a reservation."""
+    __tablename__ = 'inventory_holds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    reservation_id = db.Column(db.String(32), nullable=False, index=True)  # uuid4 hex, shared by a cart's holds
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    shard = db.Column(db.Integer, nullable=True)  # Stock shard the units came from (hot SKUs only)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='held')  # held, committed, released, expired
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Expiry sweep: held rows past their deadline
+        db.Index('ix_inventory_holds_status_expires_at', 'status', 'expires_at'),
+    )
+
+
+class ProductStockShard(db.Model):
+    """A slice of a hot product's stock; reservations spread their row locks across shards."""
+    __tablename__ = 'product_stock_shards'
+
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
@@ -7,7 +7,7 @@ class Order(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    items = db.Column(db.Text, nullable=False)  # JSON array of order items
+    items = db.Column(db.Text, nullable=False)  # JSON snapshot of the cart, for display
     total = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, processing, shipped, delivered, cancelled
     payment_method = db.Column(db.String(50), default='cod')
@@ -18,6 +18,8 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    line_items = db.relationship('OrderItem', backref='order', lazy=True)
+    
     def to_dict(self):
         items_list = json.loads(self.items) if self.items else []
         # Get first product name for display
@@ -0,0 +1,23 @@
+from . import db
+
+class OrderItem(db.Model):
+    """One product line of an order, with the price and designer at the time of sale."""
+    __tablename__ = 'order_items'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=True)
+    design_id = db.Column(db.Integer, db.ForeignKey('designs.id'), nullable=True, index=True)
+    designer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    unit_price = db.Column(db.Float, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    
+    __table_args__ = (
+        # Aggregations per product / per designer, joined back to the order
+        db.Index('ix_order_items_product_id_order_id', 'product_id', 'order_id'),
+        db.Index('ix_order_items_designer_id_order_id', 'designer_id', 'order_id'),
+    )
+    
+    @property
+    def line_total(self):
+        return (self.unit_price or 0) * (self.quantity or 0)
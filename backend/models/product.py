@@ -1,7 +1,11 @@
 from datetime import datetime
-import json
+from sqlalchemy import func, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from . import db
 
+# Native JSONB on PostgreSQL (indexable, supports @> containment), JSON elsewhere
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
 class Product(db.Model):
     __tablename__ = 'products'
     
@@ -12,35 +16,86 @@ class Product(db.Model):
     category = db.Column(db.String(50), nullable=False, default='normal')  # normal, designer
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.String(500), nullable=False)
-    images = db.Column(db.Text, nullable=True)  # JSON array of image URLs
-    sizes = db.Column(db.Text, nullable=False, default='["S","M","L","XL"]')  # JSON array
-    colors = db.Column(db.Text, nullable=False, default='[]')  # JSON array of {name, hex}
+    images = db.Column(JSONType, nullable=True)  # Array of image URLs
+    sizes = db.Column(JSONType, nullable=False, default=lambda: ['S', 'M', 'L', 'XL'])
+    colors = db.Column(JSONType, nullable=False, default=list)  # Array of {name, hex}
     designer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     designer_name = db.Column(db.String(100), nullable=True)
     is_featured = db.Column(db.Boolean, default=False)
     is_new = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
     quantity = db.Column(db.Integer, default=0)
+    stock_shards = db.Column(db.Integer, nullable=False, default=0)  # >0: stock lives in product_stock_shards
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)
     
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'price': self.price,
-            'originalPrice': self.original_price,
-            'category': self.category,
-            'description': self.description,
-            'image': self.image,
-            'images': json.loads(self.images) if self.images else [],
-            'sizes': json.loads(self.sizes) if self.sizes else [],
-            'colors': json.loads(self.colors) if self.colors else [],
-            'designer': self.designer_name,
-            'designerId': self.designer_id,
-            'isFeatured': self.is_featured,
-            'isNew': self.is_new,
-            'isActive': self.is_active,
-            'quantity': self.quantity
-            ,'isDeleted': self.is_deleted
-        }
+    __table_args__ = (
+        # Storefront listings: filter on the flags/category, keyset-paginate on the sort key then id
+        db.Index('ix_products_listing', 'is_active', 'is_deleted', 'category', 'created_at', 'id'),
+        db.Index('ix_products_listing_newest', 'is_active', 'is_deleted', 'created_at', 'id'),
+        db.Index('ix_products_listing_price', 'is_active', 'is_deleted', 'price', 'id'),
+        # sort=featured, and /featured (is_featured = true) sorted newest first
+        db.Index('ix_products_listing_featured', 'is_active', 'is_deleted', 'is_featured', 'created_at', 'id'),
+        db.Index('ix_products_listing_new', 'is_active', 'is_deleted', 'is_new', 'created_at', 'id'),
+        # Containment lookups for the size/color filters (PostgreSQL only; not created elsewhere)
+        db.Index(
+            'ix_products_sizes', 'sizes', postgresql_using='gin', postgresql_ops={'sizes': 'jsonb_path_ops'}
+        ).ddl_if(dialect='postgresql'),
+        db.Index(
+            'ix_products_colors', 'colors', postgresql_using='gin', postgresql_ops={'colors': 'jsonb_path_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
+    
+    # API field name -> model attribute, in response order
+    API_FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'price': 'price',
+        'originalPrice': 'original_price',
+        'category': 'category',
+        'description': 'description',
+        'image': 'image',
+        'images': 'images',
+        'sizes': 'sizes',
+        'colors': 'colors',
+        'designer': 'designer_name',
+        'designerId': 'designer_id',
+        'isFeatured': 'is_featured',
+        'isNew': 'is_new',
+        'isActive': 'is_active',
+        'quantity': 'quantity',
+        'isDeleted': 'is_deleted'
+    }
+    JSON_ATTRIBUTES = ('images', 'sizes', 'colors')
+    
+    @classmethod
+    def has_size(cls, size):
+        """SQL condition: the product is offered in `size`."""
+        if db.engine.dialect.name == 'postgresql':
+            return type_coerce(cls.sizes, JSONB).contains([size])
+        entries = func.json_each(cls.sizes).table_valued('value')
+        return select(1).select_from(entries).where(entries.c.value == size).exists()
+    
+    @classmethod
+    def has_color(cls, color):
+        """SQL condition: the product is offered in a color named `color`."""
+        if db.engine.dialect.name == 'postgresql':
+            return type_coerce(cls.colors, JSONB).contains([{'name': color}])
+        entries = func.json_each(cls.colors).table_valued('value')
+        return select(1).select_from(entries).where(
+            func.json_extract(entries.c.value, '$.name') == color
+        ).exists()
+    
+    def to_dict(self, fields=None):
+        """Serialize the product; `fields` limits the output to those API field names."""
+        data = {}
+        for field, attr in self.API_FIELDS.items():
+            if fields is not None and field not in fields:
+                continue
+            value = getattr(self, attr)
+            if attr in self.JSON_ATTRIBUTES:
+                value = value or []
+            elif attr == 'id':
+                value = str(value)
+            data[field] = value
+        return data
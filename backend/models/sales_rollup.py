@@ -0,0 +1,20 @@
+from . import db
+
+class SalesRollup(db.Model):
+    """Daily sales of one designer product, by order date; kept current on every order status change."""
+    __tablename__ = 'sales_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    designer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    units = db.Column(db.Integer, nullable=False, default=0)  # Units in non-cancelled orders
+    delivered_units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    commission = db.Column(db.Float, nullable=False, default=0.0)
+    delivered_commission = db.Column(db.Float, nullable=False, default=0.0)  # Earned: commission on delivered units
+    
+    __table_args__ = (
+        db.UniqueConstraint('designer_id', 'day', 'product_id', name='uq_sales_rollups_designer_day_product'),
+        db.Index('ix_sales_rollups_product_id_day', 'product_id', 'day'),
+    )
@@ -1,4 +1,5 @@
 from datetime import datetime
+import json
 from . import db
 
 class TryOn(db.Model):
@@ -7,11 +8,56 @@ class TryOn(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=True)  # Nullable for custom designs
+    custom_design_id = db.Column(db.Integer, db.ForeignKey('custom_designs.id'), nullable=True)
+    product_name = db.Column(db.String(200), nullable=True)
     image_path = db.Column(db.String(500), nullable=True)  # Local path (optional)
     cdn_url = db.Column(db.String(500), nullable=True)  # FASHN CDN URL (preferred for deployment)
     filename = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Background job state
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, processing, completed, failed
+    prediction_id = db.Column(db.String(100), nullable=True)  # FASHN prediction id once submitted
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Lease held by the worker processing the job
+    submitted_at = db.Column(db.DateTime, nullable=True)  # When the job was sent to FASHN
+    completed_at = db.Column(db.DateTime, nullable=True)
+    cache_key = db.Column(db.String(64), nullable=True)  # Result cache entry filled in when the job completes
+    bytes_saved = db.Column(db.Integer, nullable=True)  # Input bytes removed by image normalization
+    timings = db.Column(db.Text, nullable=True)  # JSON: download, queue and processing seconds, poll count
+
     user = db.relationship('User', backref='tryons')
     product = db.relationship('Product', backref='tryons')
+    custom_design = db.relationship('CustomDesign', backref=db.backref('tryons', lazy=True))
+
+    FINISHED_STATUSES = ('completed', 'failed')
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
 
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'tryon_id': self.id,
+            'status': self.status,
+            'image_url': self.cdn_url if self.cdn_url else (f'/api/tryon/image/{self.id}' if self.image_path else None),
+            'error': self.error,
+            'bytes_saved': self.bytes_saved,
+            'timings': json.loads(self.timings) if self.timings else {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+        if self.product:
+            data['product'] = {
+                'id': self.product.id,
+                'name': self.product.name,
+                'price': self.product.price
+            }
+        if self.custom_design:
+            data['custom_design'] = {
+                'id': self.custom_design.id,
+                'name': self.custom_design.name
+            }
+        return data
@@ -0,0 +1,13 @@
+from datetime import datetime
+from . import db
+
+class TryOnCache(db.Model):
+    """Finished try-on results keyed by a digest of their inputs."""
+    __tablename__ = 'tryon_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)  # sha256 hex digest
+    cdn_url = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # LRU eviction order
+    hit_count = db.Column(db.Integer, default=0)
@@ -1,5 +1,6 @@
 from datetime import datetime
-from . import db, bcrypt
+from services import password_hasher
+from . import db
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,11 +19,15 @@ class User(db.Model):
     orders = db.relationship('Order', backref='user', lazy=True)
     transactions = db.relationship('Transaction', backref='user', lazy=True)
     
+    # Hashing runs in the password hasher pool and raises password_hasher.Overloaded when it is full
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self, include_wallet=False):
         data = {
@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from models import Order, Design, User, Product
+from sqlalchemy import func
+from models import db, Order, Design, User, Product, SalesRollup
 from utils.decorators import admin_required
+from services import admin_stats
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -9,60 +11,112 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 @jwt_required()
 @admin_required
 def get_admin_stats():
-    """Get dashboard statistics for admin."""
-    total_orders = Order.query.count()
-    pending_orders = Order.query.filter_by(status='pending').count()
-    total_revenue = sum(o.total for o in Order.query.all())
-    
-    total_designs = Design.query.count()
-    pending_designs = Design.query.filter_by(status='pending').count()
-    approved_designs = Design.query.filter_by(status='approved').count()
-    
-    total_designers = User.query.filter_by(role='designer').count()
-    total_customers = User.query.filter_by(role='customer').count()
-    
-    total_products = Product.query.filter_by(is_active=True).count()
+    """Get dashboard statistics for admin (from a snapshot refreshed every ADMIN_STATS_TTL seconds)."""
+    stats, computed_at = admin_stats.get_stats()
     
     return jsonify({
-        'stats': {
-            'totalOrders': total_orders,
-            'pendingOrders': pending_orders,
-            'totalRevenue': round(total_revenue, 2),
-            'totalDesigns': total_designs,
-            'pendingDesigns': pending_designs,
-            'approvedDesigns': approved_designs,
-            'totalDesigners': total_designers,
-            'totalCustomers': total_customers,
-            'totalProducts': total_products
-        }
+        'stats': stats,
+        'generatedAt': computed_at.isoformat()
     })
 
+DESIGNER_SORTS = ('sales', 'earnings', 'joinDate')
+
 @admin_bp.route('/designers', methods=['GET'])
 @jwt_required()
 @admin_required
 def get_designers():
-    """Get all designers."""
-    designers = User.query.filter_by(role='designer').all()
+    """
+    Get all designers with their design count, sales and earnings.
+    Query params:
+    - sort: sales, earnings or joinDate (default); order: asc (default) or desc
+    - limit / offset: optional paging; the response then includes total and nextOffset
+    """
+    sort = request.args.get('sort', 'joinDate')
+    order = request.args.get('order', 'asc')
+    if sort not in DESIGNER_SORTS or order not in ('asc', 'desc'):
+        return jsonify({'message': f"Invalid sort. Use sort={'|'.join(DESIGNER_SORTS)} and order=asc|desc"}), 400
+    
+    design_counts = (
+        db.session.query(Design.designer_id, func.count(Design.id).label('total_designs'))
+        .group_by(Design.designer_id)
+        .subquery()
+    )
+    # Delivered units and the commission earned on them, from the daily sales rollups;
+    # commission on orders not yet delivered is not counted until delivery
+    sales = (
+        db.session.query(
+            SalesRollup.designer_id,
+            func.sum(SalesRollup.delivered_units).label('total_sales'),
+            func.sum(SalesRollup.delivered_commission).label('total_earnings')
+        )
+        .group_by(SalesRollup.designer_id)
+        .subquery()
+    )
+    total_designs = func.coalesce(design_counts.c.total_designs, 0)
+    total_sales = func.coalesce(sales.c.total_sales, 0)
+    total_earnings = func.coalesce(sales.c.total_earnings, 0)
+    sort_column = {'sales': total_sales, 'earnings': total_earnings, 'joinDate': User.created_at}[sort]
+    
+    query = (
+        db.session.query(
+            User.id, User.name, User.email, User.avatar, User.wallet_balance, User.created_at,
+            total_designs.label('total_designs'),
+            total_sales.label('total_sales'),
+            total_earnings.label('total_earnings'),
+            func.count().over().label('total_count')  # Matches before LIMIT, in the same query
+        )
+        .outerjoin(design_counts, design_counts.c.designer_id == User.id)
+        .outerjoin(sales, sales.c.designer_id == User.id)
+        .filter(User.role == 'designer')
+        .order_by(sort_column.desc() if order == 'desc' else sort_column.asc(), User.id)
+    )
+    
+    paginate = 'limit' in request.args or 'offset' in request.args
+    if paginate:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        query = query.limit(limit).offset(offset)
+    rows = query.all()
+    
+    result = [{
+        'id': str(row.id),
+        'name': row.name,
+        'email': row.email,
+        'avatar': row.avatar,
+        'totalDesigns': row.total_designs,
+        'totalSales': row.total_sales,
+        'totalEarnings': round(row.total_earnings, 2),
+        'walletBalance': row.wallet_balance,
+        'joinDate': row.created_at.strftime('%Y-%m-%d') if row.created_at else None
+    } for row in rows]
     
-    result = []
-    for designer in designers:
-        designs = Design.query.filter_by(designer_id=designer.id).all()
-        total_sales = sum(d.sales for d in designs)
-        total_earnings = sum(d.revenue for d in designs) * 0.05  # 5% commission
-        
-        result.append({
-            'id': str(designer.id),
-            'name': designer.name,
-            'email': designer.email,
-            'avatar': designer.avatar,
-            'totalDesigns': len(designs),
-            'totalSales': total_sales,
-            'totalEarnings': round(total_earnings, 2),
-            'walletBalance': designer.wallet_balance,
-            'joinDate': designer.created_at.strftime('%Y-%m-%d') if designer.created_at else None
-        })
+    if not paginate:
+        return jsonify({'designers': result})
     
-    return jsonify({'designers': result})
+    total = rows[0].total_count if rows else db.session.query(func.count(User.id)).filter(User.role == 'designer').scalar()
+    next_offset = offset + len(rows)
+    return jsonify({
+        'designers': result,
+        'total': total,
+        'nextOffset': next_offset if next_offset < total else None
+    })
+
+@admin_bp.route('/metrics', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_metrics():
+    """Get runtime metrics for this backend process."""
+    from services import tryon_cache, tryon_poller, http_client, password_hasher, login_limiter
+    
+    return jsonify({
+        'metrics': {
+            'tryonCache': tryon_cache.get_stats(),
+            'tryonPoller': tryon_poller.get_stats(),
+            'httpPools': http_client.pool_stats(),
+            'passwordHasher': password_hasher.get_stats(),
+            'loginLimiter': login_limiter.get_stats()
+        }
+    })
 
 @admin_bp.route('/orders', methods=['GET'])
 @jwt_required()
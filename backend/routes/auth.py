@@ -1,9 +1,41 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from models import db, User
+from services import login_limiter, password_hasher
+from utils import identity
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+@auth_bp.errorhandler(password_hasher.Overloaded)
+def password_hasher_overloaded(e):
+    response = jsonify({'message': 'Too many sign-in attempts right now, please retry shortly'})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+@auth_bp.errorhandler(login_limiter.RateLimited)
+def login_rate_limited(e):
+    response = jsonify({'message': 'Too many login attempts, please try again later'})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+def _create_token(user):
+    return create_access_token(identity=str(user.id))
+
+def _verify_password(user, password):
+    if not user:
+        # Same bcrypt cost as a wrong password, so timing does not reveal registered emails
+        return password_hasher.check_unknown_user(password)
+    if not user.check_password(password):
+        return False
+    if user.password_needs_rehash():
+        # BCRYPT_LOG_ROUNDS changed since this hash was made; if the pool is busy, retry next login
+        try:
+            user.set_password(password)
+            db.session.commit()
+        except password_hasher.Overloaded:
+            pass
+    return True
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user (customer or designer)."""
@@ -33,7 +65,7 @@ def register():
     db.session.commit()
     
     # Create token
-    token = create_access_token(identity=str(user.id))
+    token = _create_token(user)
     
     return jsonify({
         'message': 'Registration successful',
@@ -52,12 +84,18 @@ def login():
     if not all([email, password]):
         return jsonify({'message': 'Email and password are required'}), 400
     
+    if not isinstance(email, str) or not isinstance(password, str):
+        return jsonify({'message': 'Email and password must be strings'}), 400
+    
+    # Behind a reverse proxy remote_addr is the client only with TRUSTED_PROXY_HOPS set (ProxyFix)
+    login_limiter.hit(request.remote_addr, email)
+    
     user = User.query.filter_by(email=email).first()
     
-    if not user or not user.check_password(password):
+    if not _verify_password(user, password):
         return jsonify({'message': 'Invalid email or password'}), 401
     
-    token = create_access_token(identity=str(user.id))
+    token = _create_token(user)
     
     return jsonify({
         'message': 'Login successful',
@@ -76,15 +114,21 @@ def admin_login():
     if not all([email, password]):
         return jsonify({'message': 'Email and password are required'}), 400
     
+    if not isinstance(email, str) or not isinstance(password, str):
+        return jsonify({'message': 'Email and password must be strings'}), 400
+    
+    # Behind a reverse proxy remote_addr is the client only with TRUSTED_PROXY_HOPS set (ProxyFix)
+    login_limiter.hit(request.remote_addr, email)
+    
     user = User.query.filter_by(email=email).first()
     
-    if not user or not user.check_password(password):
+    if not _verify_password(user, password):
         return jsonify({'message': 'Invalid email or password'}), 401
     
     if user.role != 'admin':
         return jsonify({'message': 'Access denied. Admin privileges required.'}), 403
     
-    token = create_access_token(identity=str(user.id))
+    token = _create_token(user)
     
     return jsonify({
         'message': 'Admin login successful',
@@ -96,8 +140,7 @@ def admin_login():
 @jwt_required()
 def get_current_user():
     """Get current authenticated user."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = identity.get_current_user()
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Design, Transaction
+from sqlalchemy import func
+from models import db, Design, Transaction, Product, SalesRollup
 from utils.decorators import designer_required
+from utils.identity import get_current_user
 
 designer_bp = Blueprint('designer', __name__, url_prefix='/api/designer')
 
@@ -11,10 +13,9 @@ designer_bp = Blueprint('designer', __name__, url_prefix='/api/designer')
 def get_designer_stats():
     """Get dashboard statistics for designer with optional date filtering."""
     from datetime import datetime
-    import json
     
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
@@ -28,102 +29,67 @@ def get_designer_stats():
     approved_designs = [d for d in designs if d.status == 'approved']
     pending_designs = [d for d in designs if d.status == 'pending']
     
-    # Get all products by this designer
-    from models import Product, Order
-    products = Product.query.filter_by(designer_id=user_id, is_active=True).all()
-    product_ids = [p.id for p in products]
-    
-    # Get all orders and filter for this designer's products
-    orders_query = Order.query
+    active_products = Product.query.filter_by(designer_id=user_id, is_active=True).count()
+    
+    # Per-product sales of this designer's active products, summed from the daily rollups
+    units = func.sum(SalesRollup.units)
+    sales_query = (
+        db.session.query(
+            Product.id, Product.name, Product.image,
+            units.label('units'),
+            func.sum(SalesRollup.delivered_units).label('delivered_units'),
+            func.sum(SalesRollup.revenue).label('revenue'),
+            func.sum(SalesRollup.commission).label('commission')
+        )
+        .join(SalesRollup, SalesRollup.product_id == Product.id)
+        .filter(SalesRollup.designer_id == user_id, Product.is_active == True)
+    )
     
     # Apply date filters
     if date_from:
         try:
-            from_date = datetime.strptime(date_from, '%Y-%m-%d')
-            orders_query = orders_query.filter(Order.created_at >= from_date)
+            sales_query = sales_query.filter(SalesRollup.day >= datetime.strptime(date_from, '%Y-%m-%d').date())
         except ValueError:
             pass
     
     if date_to:
         try:
-            to_date = datetime.strptime(date_to, '%Y-%m-%d')
-            # Add 1 day to include the end date
-            to_date = datetime(to_date.year, to_date.month, to_date.day, 23, 59, 59)
-            orders_query = orders_query.filter(Order.created_at <= to_date)
+            sales_query = sales_query.filter(SalesRollup.day <= datetime.strptime(date_to, '%Y-%m-%d').date())
         except ValueError:
             pass
     
-    all_orders = orders_query.filter(Order.status != 'cancelled').all()
-    
-    # Calculate sales for each product
-    product_sales = {}
-    total_sales = 0
-    total_revenue = 0
-    
-    for order in all_orders:
-        try:
-            items = json.loads(order.items) if order.items else []
-            for item in items:
-                item_product_id = item.get('productId') or item.get('id')
-                if item_product_id:
-                    try:
-                        item_product_id = int(item_product_id)
-                    except (ValueError, TypeError):
-                        continue
-                    
-                    if item_product_id in product_ids:
-                        quantity = item.get('quantity', 1)
-                        price = item.get('price', 0)
-                        item_total = price * quantity
-                        
-                        if item_product_id not in product_sales:
-                            # Find the product
-                            product = next((p for p in products if p.id == item_product_id), None)
-                            product_sales[item_product_id] = {
-                                'productId': str(item_product_id),
-                                'productName': product.name if product else item.get('name', 'Unknown'),
-                                'productImage': product.image if product else item.get('image', ''),
-                                'unitsSold': 0,
-                                'revenue': 0,
-                                'commission': 0
-                            }
-                        
-                        product_sales[item_product_id]['unitsSold'] += quantity
-                        product_sales[item_product_id]['revenue'] += item_total
-                        product_sales[item_product_id]['commission'] += item_total * 0.05
-                        if order.status == 'delivered':
-                            total_sales += quantity
-                        total_revenue += item_total
-        except (json.JSONDecodeError, TypeError):
-            continue
-    
-    # Convert to list and sort by units sold
-    product_sales_list = sorted(
-        product_sales.values(), 
-        key=lambda x: x['unitsSold'], 
-        reverse=True
-    )
-    
-    # Round values
-    for ps in product_sales_list:
-        ps['revenue'] = round(ps['revenue'], 2)
-        ps['commission'] = round(ps['commission'], 2)
-    
-    total_commission = total_revenue * 0.05
+    rows = [
+        row for row in
+        sales_query.group_by(Product.id, Product.name, Product.image).order_by(units.desc()).all()
+        if row.units
+    ]
+    
+    product_sales_list = [{
+        'productId': str(row.id),
+        'productName': row.name,
+        'productImage': row.image,
+        'unitsSold': row.units,
+        'revenue': round(row.revenue or 0, 2),
+        'commission': round(row.commission or 0, 2)
+    } for row in rows]
+    
+    total_sales = sum(row.delivered_units or 0 for row in rows)
+    total_revenue = sum(row.revenue or 0 for row in rows)
+    total_commission = sum(row.commission or 0 for row in rows)
     
     return jsonify({
         'stats': {
             'totalDesigns': len(designs),
             'approvedDesigns': len(approved_designs),
             'pendingDesigns': len(pending_designs),
-            'activeProducts': len(products),
+            'activeProducts': active_products,
             'totalSales': total_sales,
             'totalRevenue': round(total_revenue, 2),
             'totalCommission': round(total_commission, 2),
             'walletBalance': user.wallet_balance
         },
         'productSales': product_sales_list,
-        'designs': [d.to_dict() for d in designs]
+        'designs': [d.to_dict(designer_name=user.name) for d in designs]
     })
 
 @designer_bp.route('/transactions', methods=['GET'])
@@ -142,7 +108,7 @@ def get_transactions():
 def request_withdrawal():
     """Request withdrawal from wallet."""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     data = request.get_json()
     
     amount = data.get('amount', 0)
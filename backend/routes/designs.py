@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from models import db, Design, User, Product
 from utils.decorators import admin_required, designer_required
-import json
+from utils.identity import get_identity
+from services import garment_store, catalog_cache
 
 designs_bp = Blueprint('designs', __name__, url_prefix='/api/designs')
 
@@ -10,19 +12,18 @@ designs_bp = Blueprint('designs', __name__, url_prefix='/api/designs')
 @jwt_required()
 def get_designs():
     """Get designs - admin sees all, designer sees own."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    identity = get_identity()
     
-    if not user:
+    if not identity:
         return jsonify({'message': 'User not found'}), 404
     
     # Only return non-deleted designs
-    if user.role == 'admin':
+    if identity.role == 'admin':
         designs = Design.query.filter_by(is_deleted=False).all()
-    else:
-        designs = Design.query.filter_by(designer_id=user_id, is_deleted=False).all()
+        return jsonify({'designs': Design.serialize_many(designs)})
     
-    return jsonify({'designs': [d.to_dict() for d in designs]})
+    designs = Design.query.filter_by(designer_id=identity.id, is_deleted=False).all()
+    return jsonify({'designs': [d.to_dict(designer_name=identity.name) for d in designs]})
 
 @designs_bp.route('', methods=['POST'])
 @jwt_required()
@@ -30,7 +31,6 @@ def get_designs():
 def create_design():
     """Submit a new design for approval."""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     data = request.get_json()
     
     # Validate price
@@ -88,8 +88,8 @@ def approve_design(design_id):
         is_new=True,
         is_active=True,
         quantity=999999,  # "Infinite" stock for designer products
-        sizes=json.dumps(['S', 'M', 'L', 'XL', 'XXL']),
-        colors=json.dumps([{'name': 'Black', 'hex': '#000000'}, {'name': 'White', 'hex': '#FFFFFF'}])
+        sizes=['S', 'M', 'L', 'XL', 'XXL'],
+        colors=[{'name': 'Black', 'hex': '#000000'}, {'name': 'White', 'hex': '#FFFFFF'}]
     )
     
     db.session.add(product)
@@ -100,6 +100,9 @@ def approve_design(design_id):
     design.product_id = product.id
     
     db.session.commit()
+    catalog_cache.invalidate()
+    
+    garment_store.prefetch(product.image)
     
     return jsonify({
         'message': 'Design approved and product created successfully',
@@ -112,7 +115,7 @@ def approve_design(design_id):
 @admin_required
 def reject_design(design_id):
     """Reject a design (admin only)."""
-    design = Design.query.get(design_id)
+    design = Design.query.options(joinedload(Design.designer)).get(design_id)
     data = request.get_json()
     
     if not design:
@@ -131,14 +134,13 @@ def reject_design(design_id):
 @jwt_required()
 def delete_design(design_id):
     """Soft-delete a design (owner or admin only). Marks `is_deleted=True` and keeps product and orders intact."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    identity = get_identity()
     design = Design.query.get(design_id)
 
     if not design:
         return jsonify({'message': 'Design not found'}), 404
 
-    if design.designer_id != user_id and user.role != 'admin':
+    if design.designer_id != identity.id and identity.role != 'admin':
         return jsonify({'message': 'Access denied'}), 403
 
     # Soft-delete: mark the design as deleted so historical orders remain valid
@@ -151,15 +153,14 @@ def delete_design(design_id):
 @jwt_required()
 def update_design(design_id):
     """Update a design (owner or admin only)."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    design = Design.query.get(design_id)
+    identity = get_identity()
+    design = Design.query.options(joinedload(Design.designer)).get(design_id)
     data = request.get_json()
     
     if not design:
         return jsonify({'message': 'Design not found'}), 404
     
-    if design.designer_id != user_id and user.role != 'admin':
+    if design.designer_id != identity.id and identity.role != 'admin':
         return jsonify({'message': 'Access denied'}), 403
     
     # Update allowed fields
@@ -190,8 +191,11 @@ def update_design(design_id):
                 product.description = data['description']
             if 'image' in data:
                 product.image = data['image']
+                garment_store.prefetch(product.image)
     
     db.session.commit()
+    if design.status == 'approved' and design.product_id:
+        catalog_cache.invalidate()
     
     return jsonify({
         'message': 'Design updated successfully',
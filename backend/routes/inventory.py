@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, Product, InventoryHold
+from services import inventory
+
+inventory_bp = Blueprint('inventory', __name__, url_prefix='/api/inventory')
+
+@inventory_bp.route('/reservations', methods=['POST'])
+@jwt_required()
+def create_reservation():
+    """
+    Hold stock for a cart while the customer checks out.
+    Body: {items: [{productId, quantity}]}. Pass the returned reservationId
+    to POST /api/orders to buy the held units.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    items = data.get('items', [])
+    if not items:
+        return jsonify({'message': 'Reservation must contain items'}), 400
+    try:
+        quantities = inventory.cart_quantities(items)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(quantities)).all()}
+    for product_id in quantities:
+        product = products.get(product_id)
+        if not product or not product.is_active or product.is_deleted:
+            return jsonify({'message': f'Product {product_id} not found'}), 404
+    
+    try:
+        reservation_id = inventory.reserve(int(user_id), quantities, products)
+    except inventory.OutOfStock as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+    
+    db.session.commit()
+    return jsonify({'reservation': _reservation_dict(reservation_id)}), 201
+
+@inventory_bp.route('/reservations/<reservation_id>', methods=['GET'])
+@jwt_required()
+def get_reservation(reservation_id):
+    """Get the state of one of the current user's reservations."""
+    reservation = _reservation_dict(reservation_id, int(get_jwt_identity()))
+    if not reservation:
+        return jsonify({'message': 'Reservation not found'}), 404
+    return jsonify({'reservation': reservation})
+
+@inventory_bp.route('/reservations/<reservation_id>', methods=['DELETE'])
+@jwt_required()
+def release_reservation(reservation_id):
+    """Give the held units back (e.g. the customer left checkout)."""
+    released = inventory.release(reservation_id, int(get_jwt_identity()))
+    db.session.commit()
+    if not released:
+        return jsonify({'message': 'Reservation not found or no longer active'}), 404
+    return jsonify({'message': 'Reservation released'})
+
+def _reservation_dict(reservation_id, user_id=None):
+    query = InventoryHold.query.filter_by(reservation_id=reservation_id)
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    holds = query.all()
+    if not holds:
+        return None
+    
+    quantities = {}
+    for hold in holds:
+        quantities[hold.product_id] = quantities.get(hold.product_id, 0) + hold.quantity
+    return {
+        'reservationId': reservation_id,
+        'status': holds[0].status,
+        'expiresAt': holds[0].expires_at.isoformat(),
+        'items': [{'productId': str(pid), 'quantity': q} for pid, q in quantities.items()]
+    }
@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import json
-from models import db, Order, User, Product, Transaction, Design
+from sqlalchemy import case, func, insert, update
+from models import db, Order, OrderItem, User, Product, Transaction, Design
 from utils.decorators import admin_required
+from utils.identity import get_identity, get_current_user
+from config import Config
+from services import catalog_cache, inventory, sales_rollup
 
 orders_bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
@@ -10,16 +14,15 @@ orders_bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 @jwt_required()
 def get_orders():
     """Get orders - admin sees all, user sees own."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    identity = get_identity()
     
-    if not user:
+    if not identity:
         return jsonify({'message': 'User not found'}), 404
     
-    if user.role == 'admin':
+    if identity.role == 'admin':
         orders = Order.query.order_by(Order.created_at.desc()).all()
     else:
-        orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
+        orders = Order.query.filter_by(user_id=identity.id).order_by(Order.created_at.desc()).all()
     
     return jsonify({'orders': [o.to_dict() for o in orders]})
 
@@ -28,7 +31,7 @@ def get_orders():
 def create_order():
     """Create a new order."""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     data = request.get_json()
     
     if not user:
@@ -37,24 +40,33 @@ def create_order():
     items = data.get('items', [])
     if not items:
         return jsonify({'message': 'Order must contain items'}), 400
-        
-    # Check inventory and deduct stock
-    from models import Product # Ensure Product is imported
     
-    total_amount = 0
-    for item in items:
-        product_id = item.get('productId') or item.get('id')
-        quantity = item.get('quantity', 1)
-        
-        product = Product.query.get(product_id)
-        if not product:
+    try:
+        quantities = inventory.cart_quantities(items)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    products = {p.id: p for p in Product.query.filter(Product.id.in_(quantities)).all()}
+    for product_id in quantities:
+        if product_id not in products:
             return jsonify({'message': f'Product {product_id} not found'}), 404
-            
-        if product.quantity < quantity:
-            return jsonify({'message': f'Insufficient stock for {product.name}. Available: {product.quantity}'}), 400
-            
-        product.quantity -= quantity
-        total_amount += product.price * quantity
+    
+    # Buy units held by a checkout reservation, or reserve them now
+    reservation_id = data.get('reservationId')
+    try:
+        if reservation_id:
+            if inventory.reserved_quantities(reservation_id, int(user_id)) != quantities:
+                return jsonify({'message': 'Order items do not match the reservation'}), 409
+        else:
+            reservation_id = inventory.reserve(int(user_id), quantities, products)
+    except inventory.OutOfStock as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    except inventory.ReservationError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+    
+    total_amount = sum(products[pid].price * quantity for pid, quantity in quantities.items())
 
     order = Order(
         user_id=user_id,
@@ -69,65 +81,74 @@ def create_order():
     )
     
     db.session.add(order)
-
-    # Create pending earning transactions for designers at order creation
+    db.session.flush()
+    
+    try:
+        inventory.commit(reservation_id, order.id)
+    except inventory.ReservationError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+
+    # Line items, priced from the catalog at the time of sale
+    designer_product_ids = [pid for pid in quantities if products[pid].designer_id]
+    design_ids = dict(
+        db.session.query(Design.product_id, Design.id)
+        .filter(Design.product_id.in_(designer_product_ids))
+        .all()
+    ) if designer_product_ids else {}
+    line_items = [
+        {
+            'order_id': order.id,
+            'product_id': product_id,
+            'design_id': design_ids.get(product_id),
+            'designer_id': products[product_id].designer_id,
+            'unit_price': products[product_id].price,
+            'quantity': quantity
+        }
+        for product_id, quantity in quantities.items()
+    ]
+    db.session.execute(insert(OrderItem), line_items)
+    sales_rollup.apply_transition(order, None, order.status, line_items)
+
+    # Create earning transactions for designers at order creation
     try:
-        db.session.flush()
-
-        items_list = items
         earnings_by_designer = {}
-
-        for item in items_list:
-            product_id = item.get('productId') or item.get('id')
-            quantity = item.get('quantity', 1)
-
-            product = Product.query.get(product_id)
-            if not product:
-                continue
-
-            designer_id = product.designer_id
-            if not designer_id:
-                continue
-
-            earning = (product.price or 0) * quantity * 0.05
-            if earning > 0:
-                earnings_by_designer.setdefault(designer_id, 0)
-                earnings_by_designer[designer_id] += earning
-
-        desc = f'Earnings for order ORD-{order.id:03d}'
-        for designer_id, amount in earnings_by_designer.items():
-            # Avoid duplicating pending transactions for same order+designer
-            existing = Transaction.query.filter_by(user_id=designer_id, type='earning', status='pending', description=desc).first()
-            if existing:
-                continue
-            if data.get("paymentMethod") == "cod":
-                tx = Transaction(
-                    user_id=designer_id,
-                    type='earning',
-                    amount=amount,
-                    description=desc,
-                    status='pending'
-                )
-            else:
-                designer = User.query.get(designer_id)
-                if not designer:
-                  continue
-                designer.wallet_balance = (designer.wallet_balance or 0) + amount
-                tx = Transaction(
-                    user_id=designer_id,
-                    type='earning',
-                    amount=amount,
-                    description=desc,
-                    status='completed'
+        for line in line_items:
+            earning = (line['unit_price'] or 0) * line['quantity'] * Config.DESIGNER_COMMISSION
+            if line['designer_id'] and earning > 0:
+                earnings_by_designer.setdefault(line['designer_id'], 0)
+                earnings_by_designer[line['designer_id']] += earning
+
+        if earnings_by_designer:
+            # Pay-now orders credit designers immediately; COD earnings stay pending until delivery
+            status = 'pending' if data.get('paymentMethod') == 'cod' else 'completed'
+            if status == 'completed':
+                db.session.execute(
+                    update(User)
+                    .where(User.id.in_(earnings_by_designer))
+                    .values(wallet_balance=func.coalesce(User.wallet_balance, 0) + case(earnings_by_designer, value=User.id))
+                    .execution_options(synchronize_session=False)
                 )
 
-            db.session.add(tx)
+            desc = f'Earnings for order ORD-{order.id:03d}'
+            db.session.execute(insert(Transaction), [
+                {
+                    'user_id': designer_id,
+                    'type': 'earning',
+                    'amount': amount,
+                    'description': desc,
+                    'status': status
+                }
+                for designer_id, amount in earnings_by_designer.items()
+            ])
 
     except Exception:
         db.session.rollback()
         return jsonify({'message': 'Failed to create pending transactions for designers'}), 500
 
     db.session.commit()
+    # Stock levels are part of the catalog listings
+    catalog_cache.invalidate()
 
     return jsonify({
         'message': 'Order created successfully',
@@ -152,37 +173,25 @@ def update_order_status(order_id):
 
     previous_status = order.status
     order.status = new_status
+    sales_rollup.apply_transition(order, previous_status, new_status)
+
+    desc = f'Earnings for order ORD-{order.id:03d}'
 
     # If order moves to processing or shipped, create pending earning transactions for designers
     if new_status in ['processing', 'shipped'] and previous_status != new_status:
         try:
-            items = json.loads(order.items) if order.items else []
-            earnings_by_designer = {}
-
-            for item in items:
-                product_id = item.get('productId') or item.get('id')
-                quantity = item.get('quantity', 1)
-
-                product = Product.query.get(product_id)
-                if not product:
-                    continue
-
-                designer_id = product.designer_id
-                if not designer_id:
-                    continue
-
-                earning = (product.price or 0) * quantity * 0.05
-                if earning > 0:
-                    earnings_by_designer.setdefault(designer_id, 0)
-                    earnings_by_designer[designer_id] += earning
+            earnings_by_designer = _designer_earnings(order.id)
+            # Avoid duplicating transactions already created for this order
+            existing = {
+                row.user_id for row in
+                Transaction.query.with_entities(Transaction.user_id)
+                .filter_by(type='earning', status='pending', description=desc)
+                .filter(Transaction.user_id.in_(earnings_by_designer))
+            } if earnings_by_designer else set()
 
-            desc = f'Earnings for order ORD-{order.id:03d}'
-            # Create pending transactions, avoid duplicates
             for designer_id, amount in earnings_by_designer.items():
-                existing = Transaction.query.filter_by(user_id=designer_id, type='earning', status='pending', description=desc).first()
-                if existing:
+                if designer_id in existing:
                     continue
-
                 tx = Transaction(
                     user_id=designer_id,
                     type='earning',
@@ -199,17 +208,14 @@ def update_order_status(order_id):
     # If delivered: complete pending transactions, credit wallets and update design sales
     if new_status == 'delivered' and previous_status != 'delivered':
         try:
-            desc = f'Earnings for order ORD-{order.id:03d}'
             # Find pending earning transactions for this order
             pending_txs = Transaction.query.filter_by(description=desc, type='earning', status='pending').all()
 
-            items = json.loads(order.items) if order.items else []
-            sales_by_design = {}
-
             if pending_txs:
                 # Complete existing pending transactions and credit wallets
+                designers = {u.id: u for u in User.query.filter(User.id.in_({tx.user_id for tx in pending_txs}))}
                 for tx in pending_txs:
-                    designer = User.query.get(tx.user_id)
+                    designer = designers.get(tx.user_id)
                     if not designer:
                         continue
                     # Mark transaction completed
@@ -217,47 +223,11 @@ def update_order_status(order_id):
                     # Credit wallet
                     designer.wallet_balance = (designer.wallet_balance or 0) + (tx.amount or 0)
 
-                # Update design sales counts from order items
-                for item in items:
-                    product_id = item.get('productId') or item.get('id')
-                    quantity = item.get('quantity', 1)
-                    product = Product.query.get(product_id)
-                    if not product:
-                        continue
-                    design = Design.query.filter_by(product_id=product.id).first()
-                    if design:
-                        sales_by_design.setdefault(design.id, 0)
-                        sales_by_design[design.id] += quantity
-
-                for design_id, qty in sales_by_design.items():
-                    design = Design.query.get(design_id)
-                    if not design:
-                        continue
-                    design.sales = (design.sales or 0) + qty
-
             else:
-                earnings_by_designer = {}
-                for item in items:
-                    product_id = item.get('productId') or item.get('id')
-                    quantity = item.get('quantity', 1)
-                    product = Product.query.get(product_id)
-                    if not product:
-                        continue
-                    designer_id = product.designer_id
-                    if not designer_id:
-                        continue
-                    earning = (product.price or 0) * quantity * 0.05
-                    if earning > 0:
-                        earnings_by_designer.setdefault(designer_id, 0)
-                        earnings_by_designer[designer_id] += earning
-
-                    design = Design.query.filter_by(product_id=product.id).first()
-                    if design:
-                        sales_by_design.setdefault(design.id, 0)
-                        sales_by_design[design.id] += quantity
-
+                earnings_by_designer = _designer_earnings(order.id)
+                designers = {u.id: u for u in User.query.filter(User.id.in_(earnings_by_designer))} if earnings_by_designer else {}
                 for designer_id, amount in earnings_by_designer.items():
-                    designer = User.query.get(designer_id)
+                    designer = designers.get(designer_id)
                     if not designer:
                         continue
                     designer.wallet_balance = (designer.wallet_balance or 0) + amount
@@ -270,11 +240,20 @@ def update_order_status(order_id):
                     )
                     db.session.add(tx)
 
-                for design_id, qty in sales_by_design.items():
-                    design = Design.query.get(design_id)
-                    if not design:
-                        continue
-                    design.sales = (design.sales or 0) + qty
+            # Update design sales counts from the order's line items
+            sales_by_design = dict(
+                db.session.query(OrderItem.design_id, func.sum(OrderItem.quantity))
+                .filter(OrderItem.order_id == order.id, OrderItem.design_id.isnot(None))
+                .group_by(OrderItem.design_id)
+                .all()
+            )
+            if sales_by_design:
+                db.session.execute(
+                    update(Design)
+                    .where(Design.id.in_(sales_by_design))
+                    .values(sales=func.coalesce(Design.sales, 0) + case(sales_by_design, value=Design.id))
+                    .execution_options(synchronize_session=False)
+                )
 
         except Exception:
             db.session.rollback()
@@ -288,19 +267,28 @@ def update_order_status(order_id):
         'order': order.to_dict()
     })
 
+def _designer_earnings(order_id):
+    """Commission owed to each designer for an order, from its line items."""
+    rows = (
+        db.session.query(OrderItem.designer_id, func.sum(OrderItem.unit_price * OrderItem.quantity))
+        .filter(OrderItem.order_id == order_id, OrderItem.designer_id.isnot(None))
+        .group_by(OrderItem.designer_id)
+        .all()
+    )
+    return {designer_id: revenue * Config.DESIGNER_COMMISSION for designer_id, revenue in rows if revenue}
+
 @orders_bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
 def get_order(order_id):
     """Get a single order."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    identity = get_identity()
     order = Order.query.get(order_id)
     
     if not order:
         return jsonify({'message': 'Order not found'}), 404
     
     # Check access
-    if order.user_id != user_id and user.role != 'admin':
+    if not identity or (order.user_id != identity.id and identity.role != 'admin'):
         return jsonify({'message': 'Access denied'}), 403
     
     return jsonify({'order': order.to_dict()})
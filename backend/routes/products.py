@@ -1,23 +1,106 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import load_only
 from models import db, Product
+from services import garment_store, catalog_cache, product_search, inventory
+from services.catalog_cache import catalog_cached
+from utils.pagination import keyset_page, order_by_clauses, InvalidCursor
 
 products_bp = Blueprint('products', __name__, url_prefix='/api/products')
 
+SORT_OPTIONS = {
+    'newest': [(Product.created_at, 'desc'), (Product.id, 'desc')],
+    'price_asc': [(Product.price, 'asc'), (Product.id, 'asc')],
+    'price_desc': [(Product.price, 'desc'), (Product.id, 'desc')],
+    'featured': [(Product.is_featured, 'desc'), (Product.created_at, 'desc'), (Product.id, 'desc')],
+}
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+def _list_products(query):
+    """
+    Serialize a product listing with optional sorting, projection and paging.
+    Query params:
+    - sort: newest (default), price_asc, price_desc, featured
+    - fields: comma-separated API field names to return (e.g. id,name,price,image)
+    - limit / cursor: keyset pagination; the response then includes nextCursor.
+      Without them every matching product is returned.
+    """
+    sort = request.args.get('sort', 'newest')
+    if sort not in SORT_OPTIONS:
+        return jsonify({'message': f"Invalid sort. Use one of: {', '.join(SORT_OPTIONS)}"}), 400
+    columns = SORT_OPTIONS[sort]
+    
+    fields = None
+    if request.args.get('fields'):
+        fields = {f.strip() for f in request.args['fields'].split(',') if f.strip()}
+        unknown = fields - set(Product.API_FIELDS)
+        if unknown:
+            return jsonify({'message': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+        # Only load the requested columns (plus the sort key needed for the cursor)
+        attrs = {Product.API_FIELDS[f] for f in fields} | {column.key for column, _ in columns}
+        query = query.options(load_only(*[getattr(Product, a) for a in attrs]))
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        products = query.order_by(*order_by_clauses(columns)).all()
+        return jsonify({'products': [p.to_dict(fields) for p in products]})
+    
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    try:
+        products, next_cursor = keyset_page(query, columns, request.args.get('cursor'), limit)
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'products': [p.to_dict(fields) for p in products],
+        'nextCursor': next_cursor
+    })
+
 @products_bp.route('', methods=['GET'])
 @products_bp.route('/', methods=['GET'])
+@catalog_cached
 def get_products():
-    """Get all active products."""
+    """Get all active products, optionally filtered by category, size and color."""
     category = request.args.get('category')
+    size = request.args.get('size')
+    color = request.args.get('color')
     
     # Only return non-deleted, active products
     query = Product.query.filter_by(is_active=True, is_deleted=False)
     
     if category:
         query = query.filter_by(category=category)
+    if size:
+        query = query.filter(Product.has_size(size))
+    if color:
+        query = query.filter(Product.has_color(color))
     
-    products = query.all()
-    return jsonify({'products': [p.to_dict() for p in products]})
+    return _list_products(query)
+
+@products_bp.route('/search', methods=['GET'])
+@catalog_cached
+def search_products():
+    """
+    Full-text search over product name, designer and description.
+    Query params: q (required), limit (default 20, max 100), offset.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'message': 'Query parameter q is required'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    results, total = product_search.search(q, limit, offset)
+    
+    next_offset = offset + len(results)
+    return jsonify({
+        'products': [
+            {**r['product'].to_dict(), 'rank': round(r['rank'], 4), 'highlight': r['highlight']}
+            for r in results
+        ],
+        'total': total,
+        'nextOffset': next_offset if next_offset < total else None
+    })
 
 @products_bp.route('/<int:product_id>', methods=['GET'])
 def get_product(product_id):
@@ -30,16 +113,16 @@ def get_product(product_id):
     return jsonify({'product': product.to_dict()})
 
 @products_bp.route('/featured', methods=['GET'])
+@catalog_cached
 def get_featured_products():
     """Get featured products."""
-    products = Product.query.filter_by(is_active=True, is_featured=True, is_deleted=False).all()
-    return jsonify({'products': [p.to_dict() for p in products]})
+    return _list_products(Product.query.filter_by(is_active=True, is_featured=True, is_deleted=False))
 
 @products_bp.route('/new', methods=['GET'])
+@catalog_cached
 def get_new_arrivals():
     """Get new arrival products."""
-    products = Product.query.filter_by(is_active=True, is_new=True, is_deleted=False).all()
-    return jsonify({'products': [p.to_dict() for p in products]})
+    return _list_products(Product.query.filter_by(is_active=True, is_new=True, is_deleted=False))
 
 @products_bp.route('', methods=['POST'])
 @jwt_required()
@@ -62,14 +145,17 @@ def create_product():
     )
     
     if data.get('sizes'):
-        import json
-        product.sizes = json.dumps(data.get('sizes'))
+        product.sizes = data.get('sizes')
     if data.get('colors'):
-        import json
-        product.colors = json.dumps(data.get('colors'))
+        product.colors = data.get('colors')
+    if data.get('images'):
+        product.images = data.get('images')
     
     db.session.add(product)
     db.session.commit()
+    catalog_cache.invalidate()
+    
+    garment_store.prefetch(product.image)
     
     return jsonify({'product': product.to_dict()}), 201
 
@@ -102,17 +188,21 @@ def update_product(product_id):
     if 'isNew' in data or 'is_new' in data:
         product.is_new = data.get('isNew', data.get('is_new', False))
     if 'quantity' in data:
-        product.quantity = data['quantity']
+        inventory.set_stock(product, data['quantity'])
     if 'isActive' in data or 'is_active' in data:
         product.is_active = data.get('isActive', data.get('is_active', True))
     if 'sizes' in data:
-        import json
-        product.sizes = json.dumps(data['sizes'])
+        product.sizes = data['sizes']
     if 'colors' in data:
-        import json
-        product.colors = json.dumps(data['colors'])
+        product.colors = data['colors']
+    if 'images' in data:
+        product.images = data['images']
     
     db.session.commit()
+    catalog_cache.invalidate()
+    
+    if 'image' in data:
+        garment_store.prefetch(product.image)
     
     return jsonify({'product': product.to_dict()})
 
@@ -127,5 +217,6 @@ def delete_product(product_id):
     # Soft-delete the product to preserve historical orders
     product.is_deleted = True
     db.session.commit()
+    catalog_cache.invalidate()
 
     return jsonify({'message': 'Product soft-deleted successfully'})
@@ -1,27 +1,33 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Product, TryOn, CustomDesign
-from services.tryon_service import generate_tryon
+from models import db, Product, TryOn, CustomDesign
+from services import tryon_jobs, tryon_cache, garment_store, image_pipeline
+from utils.identity import get_identity
+from PIL import UnidentifiedImageError
 import uuid
 import os
+import json
+import time
 import base64
 from datetime import datetime
 
 tryon_bp = Blueprint('tryon', __name__, url_prefix='/api/tryon')
 
+MAX_JOB_WAIT_SECONDS = 2  # A waiting request holds a sync worker; clients poll with backoff
+
 @tryon_bp.route('/generate', methods=['POST'])
 @jwt_required()
 def create_tryon():
     """
-    Generate AI try-on image.
+    Queue an AI try-on job. Returns 202 with the job id; poll
+    GET /api/tryon/jobs/<id> for the result.
     Expects multipart form data:
     - user_photo: image file (user wearing nothing/basic)
     - product_id: product to try on (can be "custom-{id}" for custom designs)
     """
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
-    if not user:
+    if not get_identity():
         return jsonify({'error': 'User not found'}), 401
     
     # Validate files
@@ -40,6 +46,7 @@ def create_tryon():
     product_name = "Custom Design"
     actual_product_id = None
     custom_design = None
+    timings = {}
     
     if is_custom_design:
         # Extract custom design ID
@@ -75,72 +82,90 @@ def create_tryon():
         product_name = product.name
         actual_product_id = product.id
         
-        # Get product image (download from URL or use local file)
-        import requests
-        if product.image.startswith('http'):
-            # External URL - download it
-            product_image_data = requests.get(product.image).content
-        elif product.image.startswith('/api/uploads/'):
-            # Local upload path - read from uploads folder
-            from config import Config
-            # Extract the path after /api/uploads/
-            relative_path = product.image.replace('/api/uploads/', '')
-            local_path = os.path.join(Config.UPLOAD_FOLDER, relative_path)
-            with open(local_path, 'rb') as f:
-                product_image_data = f.read()
-        else:
-            # Direct file path
-            with open(product.image, 'rb') as f:
-                product_image_data = f.read()
+        # Get product image (served from the local garment store)
+        try:
+            download_started = time.monotonic()
+            product_image_data = garment_store.load_image(product.image)
+            timings['download'] = round(time.monotonic() - download_started, 3)
+        except Exception as e:
+            return jsonify({'error': f'Could not load product image: {str(e)}'}), 502
     
     try:
         # Read user photo
         user_photo_data = user_photo_file.read()
         
-        # Generate try-on using FASHN API
-        result = generate_tryon(
-            user_photo=user_photo_data,
-            product_image=product_image_data,
-            product_name=product_name
-        )
-        
-        cdn_url = result['cdn_url']
+        # Orient, downscale and re-encode both images before hashing and submission
+        try:
+            user_photo_data, product_image_data, bytes_saved = image_pipeline.normalize_pair(user_photo_data, product_image_data)
+        except UnidentifiedImageError:
+            return jsonify({'error': 'user_photo and product image must be valid images'}), 400
         
-        # Save try-on record to database with CDN URL
         tryon_record = TryOn(
             user_id=user_id,
             product_id=actual_product_id,  # Can be None for custom designs without base product
-            cdn_url=cdn_url,  # Store the CDN URL directly
+            custom_design_id=custom_design.id if custom_design else None,
+            product_name=product_name,
+            cache_key=tryon_cache.cache_key(user_photo_data, product_image_data),
+            bytes_saved=bytes_saved,
+            timings=json.dumps(timings),
             filename=f"tryon_{uuid.uuid4()}.png"
         )
+        
+        # Same inputs were generated before: reuse the stored result
+        cached_url = tryon_cache.lookup(tryon_record.cache_key)
+        if cached_url:
+            tryon_record.cdn_url = cached_url
+            tryon_record.status = 'completed'
+            tryon_record.completed_at = datetime.utcnow()
+            db.session.add(tryon_record)
+            db.session.commit()
+            
+            response_data = tryon_record.to_dict()
+            response_data['success'] = True
+            response_data['cached'] = True
+            return jsonify(response_data), 200
+        
+        # Queue the try-on; a background worker submits it to FASHN and polls for the result
+        tryon_record.status = 'queued'
         db.session.add(tryon_record)
+        db.session.flush()  # Get the job ID
+        
+        tryon_jobs.save_job_inputs(tryon_record.id, user_photo_data, product_image_data)
         db.session.commit()
         
-        response_data = {
-            'success': True,
-            'tryon_id': tryon_record.id,
-            'image_url': cdn_url,  # Return CDN URL directly instead of local path
-        }
+        tryon_jobs.enqueue(tryon_record.id)
         
-        if is_custom_design and custom_design:
-            response_data['custom_design'] = {
-                'id': custom_design.id,
-                'name': custom_design.name
-            }
-        elif not is_custom_design:
-            product = Product.query.get(actual_product_id)
-            if product:
-                response_data['product'] = {
-                    'id': product.id,
-                    'name': product.name,
-                    'price': product.price
-                }
+        response_data = tryon_record.to_dict()
+        response_data['success'] = True
+        response_data['job_id'] = tryon_record.id
+        response_data['status_url'] = url_for('tryon.get_tryon_job', job_id=tryon_record.id)
         
-        return jsonify(response_data), 200
+        return jsonify(response_data), 202
     
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@tryon_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_tryon_job(job_id):
+    """
+    Get the state of a try-on job.
+    Pass ?wait=<seconds> to wait briefly for the job to finish (max 2s).
+    """
+    user_id = get_jwt_identity()
+    tryon = TryOn.query.get(job_id)
+    
+    if not tryon or str(tryon.user_id) != str(user_id):
+        return jsonify({'error': 'Not found or unauthorized'}), 404
+    
+    wait = min(max(request.args.get('wait', 0, type=float), 0), MAX_JOB_WAIT_SECONDS)
+    if wait and not tryon.is_finished:
+        tryon_jobs.wait_for_job(tryon.id, wait)
+        db.session.refresh(tryon)
+    
+    return jsonify(tryon.to_dict()), 200
+
 @tryon_bp.route('/image/<int:tryon_id>', methods=['GET'])
 def get_tryon_image(tryon_id):
     """Retrieve try-on image. Redirects to CDN URL if available."""
@@ -170,7 +195,7 @@ def get_tryon_image(tryon_id):
 def get_tryons():
     """Get user's try-on history."""
     user_id = get_jwt_identity()
-    tryons = TryOn.query.filter_by(user_id=user_id).all()
+    tryons = TryOn.query.filter_by(user_id=user_id, status='completed').all()
     
     result = []
     for t in tryons:
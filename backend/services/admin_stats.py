@@ -0,0 +1,99 @@
+"""
+Admin dashboard statistics.
+
+All counters come from one SELECT of scalar subqueries (one round trip,
+aggregated in the database). The result is kept as a snapshot for
+ADMIN_STATS_TTL seconds; once it is stale the previous snapshot is still
+served while a background thread recomputes it, so the dashboard never
+waits on the aggregate except for the very first request.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import func, select
+from config import Config
+from models import db, Order, Design, User, Product
+
+ORDER_STATUSES = ('pending', 'processing', 'shipped', 'delivered', 'cancelled')
+
+_snapshot = None  # {'stats': {...}, 'computed_at': epoch seconds}
+_lock = threading.Lock()
+_refreshing = False
+
+
+def get_stats():
+    """Return (stats, computed_at) from the snapshot, refreshing it as needed."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = _compute_snapshot()
+            snapshot = _snapshot
+    elif time.time() - snapshot['computed_at'] > Config.ADMIN_STATS_TTL:
+        _refresh_in_background(current_app._get_current_object())
+    return snapshot['stats'], datetime.fromtimestamp(snapshot['computed_at'], timezone.utc)
+
+
+def compute() -> dict:
+    """Compute every admin counter in a single statement."""
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    columns = {
+        'totalOrders': count(Order),
+        'totalRevenue': select(func.coalesce(func.sum(Order.total), 0)).scalar_subquery(),
+        'totalDesigns': count(Design),
+        'pendingDesigns': count(Design, Design.status == 'pending'),
+        'approvedDesigns': count(Design, Design.status == 'approved'),
+        'totalDesigners': count(User, User.role == 'designer'),
+        'totalCustomers': count(User, User.role == 'customer'),
+        'totalProducts': count(Product, Product.is_active == True),
+    }
+    for status in ORDER_STATUSES:
+        columns[f'orders:{status}'] = count(Order, Order.status == status)
+
+    row = db.session.execute(select(*[column.label(name) for name, column in columns.items()])).mappings().one()
+
+    by_status = {status: row[f'orders:{status}'] for status in ORDER_STATUSES}
+    return {
+        'totalOrders': row['totalOrders'],
+        'pendingOrders': by_status['pending'],
+        'ordersByStatus': by_status,
+        'totalRevenue': round(float(row['totalRevenue']), 2),
+        'totalDesigns': row['totalDesigns'],
+        'pendingDesigns': row['pendingDesigns'],
+        'approvedDesigns': row['approvedDesigns'],
+        'totalDesigners': row['totalDesigners'],
+        'totalCustomers': row['totalCustomers'],
+        'totalProducts': row['totalProducts']
+    }
+
+
+def _compute_snapshot() -> dict:
+    return {'stats': compute(), 'computed_at': time.time()}
+
+
+def _refresh_in_background(app):
+    global _refreshing
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+    threading.Thread(target=_refresh, args=(app,), name='admin-stats-refresh', daemon=True).start()
+
+
+def _refresh(app):
+    global _snapshot, _refreshing
+    try:
+        with app.app_context():
+            try:
+                _snapshot = _compute_snapshot()
+            finally:
+                db.session.remove()
+    except Exception as e:
+        print(f"Admin stats refresh failed: {str(e)}")
+    finally:
+        with _lock:
+            _refreshing = False
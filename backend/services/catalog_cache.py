@@ -0,0 +1,126 @@
+"""
+Read cache for the public catalog endpoints.
+
+Serialized responses of the product listings are cached under a catalog
+version. Any write that changes what the storefront shows calls
+invalidate(), which moves the catalog to a new version so every cached
+listing is bypassed at once. Responses carry an ETag and Last-Modified
+(the time of the last invalidation), so browsers revalidate with 304s.
+
+CATALOG_CACHE_BACKEND selects the store: 'memory' (per process; other
+processes pick up writes when their entries expire after CATALOG_CACHE_TTL)
+or 'redis' (shared; requires the redis package and REDIS_URL).
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, make_response
+from config import Config
+
+STATE_KEY = 'catalog:state'
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = 1024):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if len(self._data) >= self._max_entries:
+                # Entries under old catalog versions are dead weight; drop everything
+                self._data = {k: v for k, v in self._data.items() if k == STATE_KEY}
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CATALOG_CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, json.dumps(value), ex=ttl)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if Config.CATALOG_CACHE_BACKEND == 'redis':
+                _backend = RedisBackend(Config.REDIS_URL)
+            else:
+                _backend = MemoryBackend()
+        return _backend
+
+
+def invalidate():
+    """Start a new catalog version; call after committing a catalog change."""
+    get_backend().set(STATE_KEY, {'version': uuid.uuid4().hex, 'updated_at': time.time()})
+
+
+def _state() -> dict:
+    backend = get_backend()
+    state = backend.get(STATE_KEY)
+    if state is None:
+        invalidate()
+        state = backend.get(STATE_KEY)
+    return state
+
+
+def _request_key(version: str) -> str:
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"catalog:{version}:{request.path}?{args}"
+
+
+def catalog_cached(fn):
+    """Cache a catalog endpoint's 200 responses and answer conditional requests."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        state = _state()
+        key = _request_key(state['version'])
+        backend = get_backend()
+
+        entry = backend.get(key)
+        if entry is None:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data(as_text=True)
+            entry = {'body': body, 'etag': hashlib.sha1(body.encode('utf-8')).hexdigest()}
+            backend.set(key, entry, Config.CATALOG_CACHE_TTL)
+
+        response = make_response(entry['body'], 200)
+        response.mimetype = 'application/json'
+        response.set_etag(entry['etag'])
+        response.last_modified = int(state['updated_at'])
+        response.cache_control.public = True
+        response.cache_control.no_cache = True  # Always revalidate; a 304 is cheap
+        return response.make_conditional(request)
+    return wrapper
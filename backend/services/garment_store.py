@@ -0,0 +1,202 @@
+"""
+Local blob store for garment (product) images used by try-on.
+
+Remote product images are downloaded once and kept on disk next to a small
+metadata file holding the ETag / Last-Modified validators. A stored blob is
+revalidated with a conditional GET at most every GARMENT_REVALIDATE_SECONDS.
+If the origin is unreachable the stored copy is served instead of failing
+the try-on. The store is kept under GARMENT_CACHE_MAX_BYTES by evicting the
+least recently used blobs.
+
+Only hosts in GARMENT_ALLOWED_HOSTS (plus our R2 and Supabase storage hosts)
+are fetched, and redirects are not followed, so an image reference can
+never make the server request an internal address.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from config import Config
+from services import http_client
+
+LOCK_STRIPES = 64
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='garment-prefetch')
+# Downloads of the same URL are serialized; a fixed set of striped locks keeps memory bounded
+_url_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+_evict_lock = threading.Lock()
+
+
+class ImageRefError(ValueError):
+    pass
+
+
+def load_image(image_ref: str) -> bytes:
+    """
+    Return the bytes of a product image.
+    Accepts a URL on an allowed host or an /api/uploads/ path; raises ImageRefError otherwise.
+    """
+    if image_ref.startswith(('http://', 'https://')):
+        return fetch(image_ref)
+    if image_ref.startswith('/api/uploads/'):
+        return _read_file(_upload_path(image_ref[len('/api/uploads/'):]))
+    raise ImageRefError('Unsupported image reference')
+
+
+def fetch(url: str) -> bytes:
+    """Return the image at `url`, downloading or revalidating the local copy as needed."""
+    _check_host(url)
+    data_path, meta_path = _blob_paths(url)
+    with _url_lock(url):
+        meta = _read_meta(meta_path)
+        if meta and os.path.exists(data_path):
+            if time.time() - meta.get('checked_at', 0) < Config.GARMENT_REVALIDATE_SECONDS:
+                os.utime(data_path)  # Recently used, for eviction
+                return _read_file(data_path)
+            return _revalidate(url, data_path, meta_path, meta)
+        return _download(url, data_path, meta_path)
+
+
+def prefetch(image_ref: str):
+    """Warm the store for a product image in the background (no-op for local files)."""
+    if not image_ref or not image_ref.startswith('http'):
+        return
+    _prefetch_executor.submit(_prefetch, image_ref)
+
+
+def _prefetch(url: str):
+    try:
+        fetch(url)
+    except Exception as e:
+        print(f"Garment prefetch failed for {url}: {str(e)}")
+
+
+def _revalidate(url: str, data_path: str, meta_path: str, meta: dict) -> bytes:
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        response = http_client.get(url, headers=headers, timeout=Config.GARMENT_FETCH_TIMEOUT, allow_redirects=False)
+    except requests.RequestException as e:
+        print(f"Garment revalidation failed for {url}, serving stored copy: {str(e)}")
+        return _read_file(data_path)
+
+    if response.status_code == 304:
+        meta['checked_at'] = time.time()
+        _write_meta(meta_path, meta)
+        return _read_file(data_path)
+
+    if response.status_code != 200:
+        print(f"Garment revalidation returned {response.status_code} for {url}, serving stored copy")
+        return _read_file(data_path)
+
+    return _store(response, data_path, meta_path)
+
+
+def _download(url: str, data_path: str, meta_path: str) -> bytes:
+    response = http_client.get(url, timeout=Config.GARMENT_FETCH_TIMEOUT, allow_redirects=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to download product image: {response.status_code}")
+    return _store(response, data_path, meta_path)
+
+
+def _store(response: requests.Response, data_path: str, meta_path: str) -> bytes:
+    data = response.content
+    tmp_path = f"{data_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, data_path)
+    _write_meta(meta_path, {
+        'url': response.url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_type': response.headers.get('Content-Type'),
+        'size': len(data),
+        'checked_at': time.time()
+    })
+    _evict()
+    return data
+
+
+def _read_file(path: str) -> bytes:
+    # A plain read, not mmap: every caller needs a bytes copy (pickled to the image pool)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _upload_path(relative_path: str) -> str:
+    root = os.path.realpath(Config.UPLOAD_FOLDER)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, path]) != root:
+        raise ImageRefError('Image path is outside the uploads folder')
+    return path
+
+
+def _allowed_hosts() -> set:
+    hosts = {h.strip().lower() for h in Config.GARMENT_ALLOWED_HOSTS.split(',') if h.strip()}
+    for url in (Config.R2_PUBLIC_URL, os.getenv('SUPABASE_URL')):
+        if url:
+            hosts.add(urlsplit(url).hostname)
+    return hosts
+
+
+def _check_host(url: str):
+    host = urlsplit(url).hostname
+    if not host or host.lower() not in _allowed_hosts():
+        raise ImageRefError(f'Image host {host} is not allowed')
+
+
+def _evict():
+    """Delete least recently used blobs until the store fits GARMENT_CACHE_MAX_BYTES."""
+    with _evict_lock:
+        blobs = []
+        total = 0
+        with os.scandir(Config.GARMENT_CACHE_FOLDER) as entries:
+            for entry in entries:
+                if entry.name.endswith('.bin'):
+                    stat = entry.stat()
+                    blobs.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _mtime, size, path in sorted(blobs):
+            if total <= Config.GARMENT_CACHE_MAX_BYTES:
+                break
+            for stale in (path, path[:-len('.bin')] + '.json'):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+
+
+def _blob_paths(url: str):
+    os.makedirs(Config.GARMENT_CACHE_FOLDER, exist_ok=True)
+    name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    base = os.path.join(Config.GARMENT_CACHE_FOLDER, name)
+    return f"{base}.bin", f"{base}.json"
+
+
+def _read_meta(meta_path: str):
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path: str, meta: dict):
+    tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _url_lock(url: str) -> threading.Lock:
+    digest = hashlib.sha256(url.encode('utf-8')).digest()
+    return _url_locks[int.from_bytes(digest[:4], 'big') % LOCK_STRIPES]
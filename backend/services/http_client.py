@@ -0,0 +1,122 @@
+"""
+Shared HTTP client for outbound calls (FASHN, Supabase, image downloads).
+
+Module-level `requests.get/post` open a fresh TCP+TLS connection per call.
+This module keeps one keep-alive `requests.Session` per host with its own
+connection pool, retries idempotent requests with exponential backoff, and
+always applies a timeout. Per-host counters are exposed via pool_stats().
+"""
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+_sessions = {}  # "scheme://host" -> (requests.Session, HTTPAdapter)
+_sessions_lock = threading.Lock()
+_stats = {}  # "scheme://host" -> counters
+_stats_lock = threading.Lock()
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def default_timeout():
+    return (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+
+
+def request(method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+    """
+    Send a request through the pooled session for the URL's host.
+    Only idempotent methods are retried; `timeout` defaults to
+    (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT).
+    """
+    host = _host_key(url)
+    session = _get_session(host)
+    _track(host, 'in_flight', 1)
+    try:
+        return session.request(method, url, timeout=timeout or default_timeout(), **kwargs)
+    except requests.RequestException:
+        _track(host, 'errors', 1)
+        raise
+    finally:
+        _track(host, 'in_flight', -1)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def pool_stats() -> dict:
+    """Per-host request counters and connection pool utilization."""
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    with _stats_lock:
+        stats = {host: dict(counters) for host, counters in _stats.items()}
+
+    result = {}
+    for host, (_session, adapter) in sessions.items():
+        counters = stats.get(host, {})
+        pools = adapter.poolmanager.pools
+        idle = opened = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            opened += pool.num_connections
+            # Unused slots in the pool queue are None placeholders
+            idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        result[host] = {
+            'requests': counters.get('requests', 0),
+            'errors': counters.get('errors', 0),
+            'inFlight': counters.get('in_flight', 0),
+            'peakInFlight': counters.get('peak_in_flight', 0),
+            'poolMaxsize': Config.HTTP_POOL_MAXSIZE,
+            'connectionsOpened': opened,
+            'idleConnections': idle,
+            'utilization': round(counters.get('in_flight', 0) / Config.HTTP_POOL_MAXSIZE, 4)
+        }
+    return result
+
+
+def _get_session(host: str) -> requests.Session:
+    with _sessions_lock:
+        entry = _sessions.get(host)
+        if entry is None:
+            retry = Retry(
+                total=Config.HTTP_MAX_RETRIES,
+                backoff_factor=Config.HTTP_RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            entry = (session, adapter)
+            _sessions[host] = entry
+        return entry[0]
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _track(host: str, name: str, delta: int):
+    with _stats_lock:
+        counters = _stats.setdefault(host, {'requests': 0, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 0})
+        counters[name] += delta
+        if name == 'in_flight' and delta > 0:
+            counters['requests'] += 1
+            counters['peak_in_flight'] = max(counters['peak_in_flight'], counters['in_flight'])
@@ -0,0 +1,79 @@
+"""
+Image normalization for try-on inputs.
+
+Uploads can be up to MAX_CONTENT_LENGTH and in any format PIL understands.
+Before they are base64-encoded into a FASHN request they are EXIF-oriented,
+flattened to RGB, downscaled to TRYON_MAX_IMAGE_SIDE and re-encoded as JPEG
+without metadata. The work runs in a process pool so large decodes do not
+hold the GIL of the web worker.
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from config import Config
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def normalize_image(data: bytes, max_side: int, quality: int) -> bytes:
+    """
+    Orient, flatten, downscale and re-encode one image as metadata-free JPEG.
+    A JPEG that needs none of that is returned as is if re-encoding would
+    make it larger.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        # Try-on payloads are labelled image/jpeg, so only JPEGs may be sent unchanged
+        already_normal = (
+            img.format == 'JPEG' and img.mode == 'RGB'
+            and max(img.size) <= max_side and 'exif' not in img.info
+        )
+        img = ImageOps.exif_transpose(img)
+
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            # Flatten transparency onto white so garments keep a clean background
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        out = io.BytesIO()
+        img.save(out, 'JPEG', quality=quality, optimize=True)
+        if already_normal and out.tell() >= len(data):
+            return data
+        return out.getvalue()
+
+
+def normalize_pair(user_photo: bytes, product_image: bytes):
+    """
+    Normalize both try-on inputs in parallel.
+    Returns (user_photo, product_image, bytes_saved).
+    Raises PIL.UnidentifiedImageError if either input is not an image.
+    """
+    executor = _get_executor()
+    args = (Config.TRYON_MAX_IMAGE_SIDE, Config.TRYON_JPEG_QUALITY)
+    user_future = executor.submit(normalize_image, user_photo, *args)
+    product_future = executor.submit(normalize_image, product_image, *args)
+    normalized_user, normalized_product = user_future.result(), product_future.result()
+
+    bytes_saved = max(0, (len(user_photo) + len(product_image)) - (len(normalized_user) + len(normalized_product)))
+    return normalized_user, normalized_product, bytes_saved
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that already runs worker threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.TRYON_IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
@@ -0,0 +1,359 @@
+"""
+Inventory reservations.
+
+Stock moves in three atomic steps:
+- reserve(): takes units out of available stock with conditional UPDATEs
+  (`quantity >= :wanted`), so concurrent checkouts can never oversell, and
+  records them as holds that expire after INVENTORY_HOLD_SECONDS;
+- commit(): turns a reservation's holds into a sale for an order;
+- release(): puts held units back (also done by the expiry sweep).
+
+Hot products (limited drops) can be split into `product_stock_shards` rows
+with `flask inventory shard <product_id>`. A reservation then decrements a
+randomly chosen shard instead of the single product row, so concurrent
+checkouts contend on different rows. For sharded products
+`Product.quantity` is a display total refreshed by the sweep.
+
+These functions run inside the caller's transaction and never commit; on
+an InventoryError the caller must roll back.
+"""
+import multiprocessing
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, insert, select, update
+from config import Config
+from models import db, Product, InventoryHold, ProductStockShard
+
+_app = None
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+inventory_cli = AppGroup('inventory', help='Inventory commands.')
+
+
+class InventoryError(Exception):
+    pass
+
+
+class OutOfStock(InventoryError):
+    def __init__(self, product: Product, available: int):
+        super().__init__(f'Insufficient stock for {product.name}. Available: {available}')
+        self.product = product
+        self.available = available
+
+
+class ReservationError(InventoryError):
+    pass
+
+
+def init_app(app):
+    """
+    Register the CLI commands and arrange for the hold expiry sweep to start
+    with the first request, so CLI commands (`flask db upgrade`), shells and
+    scripts never run it. BACKGROUND_TASKS=false disables it.
+    """
+    global _app
+    app.cli.add_command(inventory_cli)
+    if not Config.BACKGROUND_TASKS or multiprocessing.parent_process() is not None:
+        return
+    _app = app
+    app.before_request(_start_sweeper)
+
+
+def _start_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        return
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_loop, name='inventory-sweeper', daemon=True)
+            _sweeper.start()
+
+
+def cart_quantities(items) -> dict:
+    """Total quantity per product id for a list of cart items; raises ValueError on bad input."""
+    quantities = {}
+    for item in items:
+        product_id = item.get('productId') or item.get('id')
+        try:
+            product_id = int(product_id)
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid order item')
+        if quantity < 1:
+            raise ValueError('Item quantity must be at least 1')
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def reserve(user_id: int, quantities: dict, products: dict = None, ttl: int = None) -> str:
+    """
+    Hold {product_id: quantity} for `user_id` and return the reservation id.
+    `products` may pass the already loaded Product rows by id.
+    Raises OutOfStock; the whole reservation must then be rolled back.
+    """
+    if products is None:
+        products = {p.id: p for p in Product.query.filter(Product.id.in_(quantities))}
+    reservation_id = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(seconds=ttl or Config.INVENTORY_HOLD_SECONDS)
+
+    holds = []
+    plain = {pid: q for pid, q in quantities.items() if not products[pid].stock_shards}
+    if plain:
+        # One conditional UPDATE for every unsharded product in the cart
+        wanted = case(plain, value=Product.id)
+        result = db.session.execute(
+            update(Product)
+            .where(Product.id.in_(plain), Product.quantity >= wanted)
+            .values(quantity=Product.quantity - wanted)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(plain):
+            short = next(
+                (products[pid] for pid, q in sorted(plain.items()) if (products[pid].quantity or 0) < q),
+                products[min(plain)]
+            )
+            raise OutOfStock(short, short.quantity or 0)
+        holds += [(pid, None, q) for pid, q in plain.items()]
+
+    for pid in sorted(set(quantities) - set(plain)):
+        holds += [(pid, shard, q) for shard, q in _take_from_shards(products[pid], quantities[pid])]
+
+    db.session.execute(insert(InventoryHold), [
+        {
+            'reservation_id': reservation_id,
+            'user_id': user_id,
+            'product_id': product_id,
+            'shard': shard,
+            'quantity': quantity,
+            'status': 'held',
+            'expires_at': expires_at
+        }
+        for product_id, shard, quantity in holds
+    ])
+    return reservation_id
+
+
+def reserved_quantities(reservation_id: str, user_id: int) -> dict:
+    """{product_id: quantity} held by an active reservation of `user_id`."""
+    holds = InventoryHold.query.filter_by(reservation_id=reservation_id, user_id=user_id, status='held').all()
+    if not holds:
+        raise ReservationError('Reservation not found or no longer active')
+    if any(h.expires_at <= datetime.utcnow() for h in holds):
+        raise ReservationError('Reservation has expired')
+    quantities = {}
+    for hold in holds:
+        quantities[hold.product_id] = quantities.get(hold.product_id, 0) + hold.quantity
+    return quantities
+
+
+def commit(reservation_id: str, order_id: int):
+    """Mark a reservation's holds as sold to `order_id`."""
+    total = InventoryHold.query.filter_by(reservation_id=reservation_id).count()
+    result = db.session.execute(
+        update(InventoryHold)
+        .where(
+            InventoryHold.reservation_id == reservation_id,
+            InventoryHold.status == 'held',
+            InventoryHold.expires_at > datetime.utcnow()
+        )
+        .values(status='committed', order_id=order_id)
+        .execution_options(synchronize_session=False)
+    )
+    # Lost a race with release() or the expiry sweep
+    if total == 0 or result.rowcount != total:
+        raise ReservationError('Reservation has expired or was already used')
+
+
+def release(reservation_id: str, user_id: int = None) -> int:
+    """Return a reservation's held units to stock. Returns the number of holds released."""
+    query = InventoryHold.query.filter_by(reservation_id=reservation_id, status='held')
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    return _release(query.all(), 'released')
+
+
+def expire_holds(limit: int = 500) -> int:
+    """Release holds past their deadline."""
+    holds = (
+        InventoryHold.query
+        .filter(InventoryHold.status == 'held', InventoryHold.expires_at <= datetime.utcnow())
+        .order_by(InventoryHold.expires_at)
+        .limit(limit)
+        .all()
+    )
+    return _release(holds, 'expired')
+
+
+def available(product: Product) -> int:
+    """Exact available stock, summing the shards of a sharded product."""
+    if not product.stock_shards:
+        return product.quantity or 0
+    return db.session.execute(
+        select(func.coalesce(func.sum(ProductStockShard.quantity), 0))
+        .where(ProductStockShard.product_id == product.id)
+    ).scalar()
+
+
+def set_stock(product: Product, quantity: int):
+    """Set a product's available stock, spreading it over its shards if it has any."""
+    if product.stock_shards:
+        _write_shards(product, quantity, product.stock_shards)
+    product.quantity = quantity
+
+
+def set_shards(product: Product, shards: int):
+    """Split a product's stock over `shards` rows (0 folds it back into the product row)."""
+    if product.stock_shards:
+        ProductStockShard.query.filter_by(product_id=product.id).with_for_update().all()
+        total = available(product)
+    else:
+        db.session.refresh(product, with_for_update=True)
+        total = product.quantity or 0
+    _write_shards(product, total, shards)
+    product.stock_shards = shards
+    product.quantity = total
+
+
+def sync_sharded_totals():
+    """Refresh Product.quantity of sharded products from their shards."""
+    total = (
+        select(func.coalesce(func.sum(ProductStockShard.quantity), 0))
+        .where(ProductStockShard.product_id == Product.id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Product)
+        .where(Product.stock_shards > 0)
+        .values(quantity=total)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _take_from_shards(product: Product, quantity: int):
+    """Decrement `quantity` units from a sharded product; returns [(shard, units), ...]."""
+    shards = product.stock_shards
+    start = random.randrange(shards)
+    for i in range(shards):
+        shard = (start + i) % shards
+        result = db.session.execute(
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.product_id == product.id,
+                ProductStockShard.shard == shard,
+                ProductStockShard.quantity >= quantity
+            )
+            .values(quantity=ProductStockShard.quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return [(shard, quantity)]
+
+    # No single shard can cover the quantity: gather it from several, locking in shard order
+    rows = (
+        ProductStockShard.query
+        .filter(ProductStockShard.product_id == product.id, ProductStockShard.quantity > 0)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+        .all()
+    )
+    total = sum(row.quantity for row in rows)
+    if total < quantity:
+        raise OutOfStock(product, total)
+    taken = []
+    remaining = quantity
+    for row in rows:
+        units = min(row.quantity, remaining)
+        row.quantity -= units
+        taken.append((row.shard, units))
+        remaining -= units
+        if not remaining:
+            break
+    db.session.flush()
+    return taken
+
+
+def _write_shards(product: Product, total: int, shards: int):
+    ProductStockShard.query.filter_by(product_id=product.id).delete(synchronize_session=False)
+    if shards <= 0:
+        return
+    base, extra = divmod(total, shards)
+    db.session.execute(insert(ProductStockShard), [
+        {'product_id': product.id, 'shard': shard, 'quantity': base + (1 if shard < extra else 0)}
+        for shard in range(shards)
+    ])
+
+
+def _release(holds, status: str) -> int:
+    released = 0
+    for hold in holds:
+        # Only the caller that flips the hold out of 'held' puts the units back
+        result = db.session.execute(
+            update(InventoryHold)
+            .where(InventoryHold.id == hold.id, InventoryHold.status == 'held')
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            _restock(hold.product_id, hold.shard, hold.quantity)
+            released += 1
+    return released
+
+
+def _restock(product_id: int, shard, quantity: int):
+    if shard is not None and _add_to_shard(product_id, shard, quantity):
+        return
+    # The product was (re)sharded or unsharded since the hold was taken
+    if _add_to_shard(product_id, 0, quantity):
+        return
+    db.session.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(quantity=Product.quantity + quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _add_to_shard(product_id: int, shard: int, quantity: int) -> bool:
+    result = db.session.execute(
+        update(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id, ProductStockShard.shard == shard)
+        .values(quantity=ProductStockShard.quantity + quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(Config.INVENTORY_SWEEP_SECONDS)
+        with _app.app_context():
+            try:
+                expired = expire_holds()
+                sync_sharded_totals()
+                db.session.commit()
+                if expired:
+                    print(f"Released {expired} expired inventory holds")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Inventory sweep failed: {str(e)}")
+            finally:
+                db.session.remove()
+
+
+@inventory_cli.command('shard')
+@click.argument('product_id', type=int)
+@click.option('--shards', type=int, default=None, help='Number of stock shards (0 to unshard).')
+def shard_command(product_id, shards):
+    """Split a hot product's stock over several rows."""
+    product = Product.query.get(product_id)
+    if not product:
+        raise click.ClickException(f'Product {product_id} not found')
+    set_shards(product, Config.INVENTORY_DEFAULT_SHARDS if shards is None else shards)
+    db.session.commit()
+    click.echo(f'{product.name}: {product.stock_shards} shards, {product.quantity} units')
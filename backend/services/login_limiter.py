@@ -0,0 +1,126 @@
+"""
+Token-bucket throttling for the login endpoints.
+
+Every login attempt takes one token from the bucket of the client IP and
+one from the bucket of the email it targets, before any database lookup
+or bcrypt work. Buckets hold up to LOGIN_*_BURST tokens and refill at
+LOGIN_*_PER_MINUTE, so a person mistyping a password a few times is never
+slowed down while a credential-stuffing run is cut off after its burst.
+The IP bucket stops one client spraying many accounts; the email bucket
+stops a botnet hammering one account from many addresses.
+
+LOGIN_LIMIT_BACKEND selects the store: 'memory' (per process) or 'redis'
+(shared by all processes; requires the redis package and REDIS_URL).
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+# Atomic refill-and-take on a hash {tokens, ts}; returns {allowed, tokens}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateLimited(Exception):
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f'Too many login attempts for this {scope}')
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class MemoryBackend:
+    EVICT_BATCH = 256
+
+    def __init__(self, max_entries: int = 100000):
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at), least recently used first
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def take(self, key: str, capacity: float, rate: float):
+        """Take one token; returns (allowed, tokens left)."""
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self._max_entries:
+                # Drop a batch of the least recently used buckets, so a full table costs
+                # O(EVICT_BATCH) once per batch instead of a scan on every attempt
+                for _ in range(min(self.EVICT_BATCH, len(self._buckets))):
+                    self._buckets.popitem(last=False)
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_LIMIT_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str, capacity: float, rate: float):
+        allowed, tokens = self._script(keys=[key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(tokens)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {'allowed': 0, 'rejectedIp': 0, 'rejectedEmail': 0}
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if Config.LOGIN_LIMIT_BACKEND == 'redis':
+                _backend = RedisBackend(Config.REDIS_URL)
+            else:
+                _backend = MemoryBackend()
+        return _backend
+
+
+def hit(ip: str, email: str):
+    """Count a login attempt from `ip` for `email`. Raises RateLimited when either bucket is empty."""
+    buckets = (
+        ('ip', f'login:ip:{ip}', Config.LOGIN_IP_BURST, Config.LOGIN_IP_PER_MINUTE),
+        ('email', f'login:email:{email.strip().lower()}', Config.LOGIN_EMAIL_BURST, Config.LOGIN_EMAIL_PER_MINUTE)
+    )
+    backend = get_backend()
+    for scope, key, burst, per_minute in buckets:
+        rate = per_minute / 60.0
+        allowed, tokens = backend.take(key, burst, rate)
+        if not allowed:
+            with _stats_lock:
+                _stats['rejectedIp' if scope == 'ip' else 'rejectedEmail'] += 1
+            raise RateLimited(scope, max(1, math.ceil((1 - tokens) / rate)))
+    with _stats_lock:
+        _stats['allowed'] += 1
+
+
+def get_stats() -> dict:
+    """Allowed and rejected login attempts seen by this process."""
+    with _stats_lock:
+        return dict(_stats)
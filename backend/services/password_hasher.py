@@ -0,0 +1,161 @@
+"""
+Password hashing off the request thread.
+
+bcrypt is deliberately slow (~250ms at cost 12), so hashing runs in a
+process pool of PASSWORD_HASH_WORKERS instead of pinning web workers on
+CPU. At most PASSWORD_HASH_QUEUE further hashes may wait for a free
+worker; anything beyond that is refused immediately with Overloaded,
+which the auth routes turn into a 429 with Retry-After, so a login burst
+sheds load instead of piling up requests that would time out anyway.
+
+Only request handlers use the pool. Outside a request (seed scripts, CLI
+commands, shells) hashing runs in the calling thread: a spawn pool would
+re-import the script's __main__ in every worker.
+
+New hashes use BCRYPT_LOG_ROUNDS. Hashes made with another cost are
+reported by needs_rehash() and replaced on the user's next login.
+"""
+import multiprocessing
+import secrets
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from flask import has_request_context
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE)
+_stats_lock = threading.Lock()
+_durations = deque(maxlen=1000)  # seconds of bcrypt work per hash or check
+_stats = {'hashes': 0, 'checks': 0, 'rejected': 0, 'inFlight': 0}
+_dummy_hashes = {}  # rounds -> hash of a random password, for check_unknown_user
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__('Too many password operations in progress')
+        self.retry_after = retry_after
+
+
+def hash_password(password: str) -> str:
+    """bcrypt hash of `password` at the configured cost. Raises Overloaded."""
+    return _run(_hash, 'hashes', password, Config.BCRYPT_LOG_ROUNDS)
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    """Whether `password` matches `password_hash`. Raises Overloaded."""
+    return _run(_check, 'checks', password_hash, password)
+
+
+def check_unknown_user(password: str) -> bool:
+    """
+    Spend the same bcrypt work as check_password for a login to an account
+    that does not exist, so response times do not reveal which emails are
+    registered. Always returns False. Raises Overloaded.
+    """
+    rounds = Config.BCRYPT_LOG_ROUNDS
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = hash_password(secrets.token_urlsafe(16))
+    check_password(_dummy_hashes[rounds], password)
+    return False
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Whether a stored hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+    try:
+        return int(password_hash.split('$')[2]) != Config.BCRYPT_LOG_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return True
+
+
+def get_stats() -> dict:
+    """Pool utilization, rejections and bcrypt time percentiles for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+        durations = list(_durations)
+    stats.update({
+        'rounds': Config.BCRYPT_LOG_ROUNDS,
+        'workers': Config.PASSWORD_HASH_WORKERS,
+        'capacity': Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE,
+        'samples': len(durations)
+    })
+    if len(durations) >= 2:
+        percentiles = statistics.quantiles(durations, n=100)
+        stats.update({
+            'p50': round(percentiles[49], 3),
+            'p90': round(percentiles[89], 3),
+            'p99': round(percentiles[98], 3)
+        })
+    return stats
+
+
+def _run(fn, counter: str, *args):
+    if not has_request_context():
+        result, elapsed = fn(*args)
+        _record(counter, elapsed)
+        return result
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats['rejected'] += 1
+        raise Overloaded(_retry_after())
+    with _stats_lock:
+        _stats['inFlight'] += 1
+    try:
+        result, elapsed = _get_executor().submit(fn, *args).result()
+    finally:
+        _slots.release()
+        with _stats_lock:
+            _stats['inFlight'] -= 1
+    _record(counter, elapsed)
+    return result
+
+
+def _record(counter: str, elapsed: float):
+    with _stats_lock:
+        _stats[counter] += 1
+        _durations.append(elapsed)
+
+
+def _retry_after() -> int:
+    """Seconds until the queue has likely drained, from the median hash time."""
+    with _stats_lock:
+        typical = statistics.median(_durations) if _durations else 0.25
+    waves = (Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE) / Config.PASSWORD_HASH_WORKERS
+    return max(1, round(typical * waves))
+
+
+def _encode(password: str) -> bytes:
+    # bcrypt only ever used the first 72 bytes; newer bcrypt releases raise instead of truncating
+    return password.encode('utf-8')[:72]
+
+
+def _hash(password: str, rounds: int):
+    started = time.perf_counter()
+    hashed = bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode('utf-8')
+    return hashed, time.perf_counter() - started
+
+
+def _check(password_hash: str, password: str):
+    started = time.perf_counter()
+    try:
+        matches = bcrypt.checkpw(_encode(password), password_hash.encode('utf-8'))
+    except ValueError:
+        # Malformed stored hash
+        matches = False
+    return matches, time.perf_counter() - started
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that already runs worker threads is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
@@ -0,0 +1,223 @@
+"""
+Full-text product search over name, designer name and description.
+
+PostgreSQL: a stored, weighted `search_vector` tsvector column with a GIN
+index, queried with websearch_to_tsquery, ranked with ts_rank_cd and
+highlighted with ts_headline.
+
+SQLite (local development): an external-content FTS5 table `products_fts`
+kept in sync by triggers, ranked with bm25() and highlighted with snippet().
+
+Both are created by the product search migration; `flask search rebuild`
+recreates them idempotently (useful after db.create_all(), or after a
+SQLite batch migration on `products` drops the triggers). If the index is
+missing, search falls back to a case-insensitive LIKE scan.
+"""
+import re
+import click
+from flask.cli import AppGroup
+from markupsafe import escape
+from sqlalchemy import func, inspect, literal_column, or_, text
+from models import db, Product
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+# Placeholders the database wraps matches in; the text is HTML-escaped before they become <mark> tags
+MATCH_START = '\ue000'
+MATCH_STOP = '\ue001'
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(designer_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, designer_name, description,
+        content='products', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, designer_name, description)
+        VALUES (new.id, new.name, new.designer_name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, designer_name, description)
+        VALUES ('delete', old.id, old.name, old.designer_name, old.description);
+    END
+    """,
+    # Only edits to indexed columns reindex; stock, flag and price updates skip the FTS table.
+    # Dropped first so a rebuild replaces a trigger created before it was narrowed.
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    """
+    CREATE TRIGGER products_fts_au AFTER UPDATE OF name, designer_name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, designer_name, description)
+        VALUES ('delete', old.id, old.name, old.designer_name, old.description);
+        INSERT INTO products_fts(rowid, name, designer_name, description)
+        VALUES (new.id, new.name, new.designer_name, new.description);
+    END
+    """,
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+
+# Column weights for bm25(), in products_fts column order
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+_index_available = None
+
+search_cli = AppGroup('search', help='Product search index commands.')
+
+
+def init_app(app):
+    app.cli.add_command(search_cli)
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """Create (if missing) and rebuild the product search index."""
+    ensure_index()
+    click.echo('Product search index rebuilt.')
+
+
+def ensure_index():
+    global _index_available
+    statements = POSTGRES_DDL if _dialect() == 'postgresql' else SQLITE_DDL
+    with db.engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    _index_available = True
+
+
+def search(q: str, limit: int = 20, offset: int = 0):
+    """
+    Search active products. Returns (results, total) where each result is
+    {'product': Product, 'rank': float, 'highlight': str}; higher rank is
+    more relevant. Highlights are HTML: the product text is escaped and
+    matches are wrapped in <mark> tags.
+    """
+    if not _has_index():
+        return _search_like(q, limit, offset)
+    if _dialect() == 'postgresql':
+        return _search_postgres(q, limit, offset)
+    return _search_sqlite(q, limit, offset)
+
+
+def _dialect() -> str:
+    return db.engine.dialect.name
+
+
+def _has_index() -> bool:
+    global _index_available
+    if _index_available is None:
+        inspector = inspect(db.engine)
+        if _dialect() == 'postgresql':
+            _index_available = any(c['name'] == 'search_vector' for c in inspector.get_columns('products'))
+        elif _dialect() == 'sqlite':
+            _index_available = inspector.has_table('products_fts')
+        else:
+            _index_available = False
+        if not _index_available:
+            print("Product search index not found, falling back to LIKE (run `flask search rebuild`)")
+    return _index_available
+
+
+def _search_postgres(q: str, limit: int, offset: int):
+    tsquery = func.websearch_to_tsquery('english', q)
+    vector = literal_column('products.search_vector')
+    rank = func.ts_rank_cd(vector, tsquery)
+    highlight = func.ts_headline(
+        'english',
+        # Same columns as search_vector, so a designer-name match is highlighted too
+        func.concat_ws(' — ', Product.name, Product.designer_name, Product.description),
+        tsquery,
+        f'StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxFragments=2, MaxWords=20, MinWords=5'
+    )
+
+    matches = Product.query.filter_by(is_active=True, is_deleted=False).filter(vector.op('@@')(tsquery))
+    total = matches.count()
+    rows = (
+        matches.with_entities(Product, rank.label('rank'), highlight.label('highlight'))
+        .order_by(rank.desc(), Product.id)
+        .limit(limit).offset(offset)
+        .all()
+    )
+    return [{'product': p, 'rank': float(r), 'highlight': _highlight_html(h)} for p, r, h in rows], total
+
+
+def _fts5_query(q: str):
+    """Turn free text into a safe FTS5 query: quoted terms, prefix match on the last one."""
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _search_sqlite(q: str, limit: int, offset: int):
+    match = _fts5_query(q)
+    if match is None:
+        return [], 0
+
+    where = """
+        FROM products_fts JOIN products ON products.id = products_fts.rowid
+        WHERE products_fts MATCH :match AND products.is_active = 1 AND products.is_deleted = 0
+    """
+    params = {'match': match}
+    total = db.session.execute(text(f"SELECT count(*) {where}"), params).scalar()
+    rows = db.session.execute(text(f"""
+        SELECT products.id,
+               -bm25(products_fts, {', '.join(str(w) for w in SQLITE_WEIGHTS)}) AS rank,
+               snippet(products_fts, -1, :start, :stop, '…', 16) AS highlight
+        {where}
+        ORDER BY rank DESC, products.id
+        LIMIT :limit OFFSET :offset
+    """), {**params, 'start': MATCH_START, 'stop': MATCH_STOP, 'limit': limit, 'offset': offset}).all()
+
+    products = {p.id: p for p in Product.query.filter(Product.id.in_([r.id for r in rows]))}
+    return [
+        {'product': products[r.id], 'rank': float(r.rank), 'highlight': _highlight_html(r.highlight)}
+        for r in rows if r.id in products
+    ], total
+
+
+def _search_like(q: str, limit: int, offset: int):
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return [], 0
+
+    matches = Product.query.filter_by(is_active=True, is_deleted=False)
+    for term in terms:
+        pattern = f'%{term}%'
+        matches = matches.filter(or_(
+            Product.name.ilike(pattern),
+            Product.designer_name.ilike(pattern),
+            Product.description.ilike(pattern)
+        ))
+    total = matches.count()
+    products = matches.order_by(Product.name, Product.id).limit(limit).offset(offset).all()
+
+    highlighter = re.compile('|'.join(re.escape(t) for t in terms), re.IGNORECASE)
+    return [{
+        'product': p,
+        'rank': 0.0,
+        'highlight': _highlight_html(highlighter.sub(lambda m: f'{MATCH_START}{m.group(0)}{MATCH_STOP}', p.name))
+    } for p in products], total
+
+
+def _highlight_html(text):
+    """Escape product text (user supplied) for HTML, then turn the match placeholders into <mark> tags."""
+    if text is None:
+        return None
+    return str(escape(text)).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_STOP, HIGHLIGHT_STOP)
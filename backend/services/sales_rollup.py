@@ -0,0 +1,134 @@
+"""
+Daily sales rollups for designer products.
+
+Every order status change applies the difference between what the order
+contributed before and after the change to its (designer, day, product)
+buckets: units, revenue and commission count while the order is not
+cancelled, delivered_units and delivered_commission while it is
+delivered. delivered_commission is what designers have earned, the same
+basis as the wallet credit made on delivery. The update runs in the
+caller's transaction, so rollups commit or roll back with the order.
+Dashboards then sum O(days x products) rollup rows instead of scanning
+orders.
+
+`flask rollups rebuild` recomputes every bucket from order_items.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from config import Config
+from models import db, Order, OrderItem, SalesRollup
+
+rollups_cli = AppGroup('rollups', help='Sales rollup commands.')
+
+SUM_COLUMNS = ('units', 'delivered_units', 'revenue', 'commission', 'delivered_commission')
+
+
+def init_app(app):
+    app.cli.add_command(rollups_cli)
+
+
+def apply_transition(order: Order, previous_status, new_status: str, lines=None):
+    """
+    Move `order`'s contribution from `previous_status` (None for a new order)
+    to `new_status`. `lines` are the order's line items (OrderItem rows or
+    dicts); they are loaded when omitted.
+    """
+    counted = _counted(new_status) - _counted(previous_status)
+    delivered = _delivered(new_status) - _delivered(previous_status)
+    if not counted and not delivered:
+        return
+
+    if lines is None:
+        lines = OrderItem.query.filter(OrderItem.order_id == order.id, OrderItem.designer_id.isnot(None)).all()
+
+    buckets = {}
+    for line in lines:
+        line = line if isinstance(line, dict) else {
+            'designer_id': line.designer_id,
+            'product_id': line.product_id,
+            'unit_price': line.unit_price,
+            'quantity': line.quantity
+        }
+        if not line['designer_id'] or not line['product_id']:
+            continue
+        revenue = (line['unit_price'] or 0) * line['quantity']
+        bucket = buckets.setdefault((line['designer_id'], line['product_id']), dict.fromkeys(SUM_COLUMNS, 0))
+        bucket['units'] += counted * line['quantity']
+        bucket['delivered_units'] += delivered * line['quantity']
+        bucket['revenue'] += counted * revenue
+        bucket['commission'] += counted * revenue * Config.DESIGNER_COMMISSION
+        bucket['delivered_commission'] += delivered * revenue * Config.DESIGNER_COMMISSION
+
+    if buckets and order.created_at:
+        day = order.created_at.date()
+        _upsert([
+            {'day': day, 'designer_id': designer_id, 'product_id': product_id, **sums}
+            for (designer_id, product_id), sums in buckets.items()
+        ])
+
+
+def rebuild():
+    """Recompute all rollups from order line items."""
+    SalesRollup.query.delete(synchronize_session=False)
+    day = func.date(Order.created_at)
+    counted = Order.status != 'cancelled'
+    delivered = Order.status == 'delivered'
+    revenue = OrderItem.unit_price * OrderItem.quantity
+    source = (
+        select(
+            day,
+            OrderItem.designer_id,
+            OrderItem.product_id,
+            func.sum(case((counted, OrderItem.quantity), else_=0)),
+            func.sum(case((delivered, OrderItem.quantity), else_=0)),
+            func.sum(case((counted, revenue), else_=0)),
+            func.sum(case((counted, revenue * Config.DESIGNER_COMMISSION), else_=0)),
+            func.sum(case((delivered, revenue * Config.DESIGNER_COMMISSION), else_=0))
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(
+            OrderItem.designer_id.isnot(None),
+            OrderItem.product_id.isnot(None),
+            Order.created_at.isnot(None)
+        )
+        .group_by(day, OrderItem.designer_id, OrderItem.product_id)
+    )
+    db.session.execute(
+        SalesRollup.__table__.insert().from_select(
+            ['day', 'designer_id', 'product_id', *SUM_COLUMNS], source
+        )
+    )
+
+
+def _counted(status) -> int:
+    return 1 if status is not None and status != 'cancelled' else 0
+
+
+def _delivered(status) -> int:
+    return 1 if status == 'delivered' else 0
+
+
+def _upsert(rows):
+    table = SalesRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(table)
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(table)
+    else:
+        raise RuntimeError(f"Sales rollups need PostgreSQL or SQLite, not {dialect}")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['designer_id', 'day', 'product_id'],
+        set_={column: table.c[column] + stmt.excluded[column] for column in SUM_COLUMNS}
+    )
+    db.session.execute(stmt, rows)
+
+
+@rollups_cli.command('rebuild')
+def rebuild_command():
+    """Recompute the sales rollups from order history."""
+    rebuild()
+    db.session.commit()
+    click.echo(f'Rebuilt {SalesRollup.query.count()} sales rollup rows.')
@@ -0,0 +1,103 @@
+"""
+Content-addressed cache of finished try-on results.
+
+Entries are keyed by a digest of the input images and the FASHN parameters,
+so regenerating the same selfie + garment returns the stored CDN URL instead
+of paying for another FASHN run. Entries expire after TRYON_CACHE_TTL_SECONDS,
+but never later than CDN_EXPIRY_MARGIN before FASHN's CDN URL itself
+expires, so a hit always returns a URL the client can still load. The least
+recently used entries are evicted beyond TRYON_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models import db, TryOnCache
+from services.tryon_service import FASHN_MODEL_NAME, FASHN_OPTIONS
+
+CDN_URL_LIFETIME = timedelta(hours=72)  # FASHN result URLs stop working after this
+CDN_EXPIRY_MARGIN = timedelta(hours=6)  # Leave clients time to download the image
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+
+def cache_key(user_photo: bytes, product_image: bytes) -> str:
+    """Digest of the try-on inputs and every FASHN parameter that affects the output."""
+    params = json.dumps({'model_name': FASHN_MODEL_NAME, **FASHN_OPTIONS}, sort_keys=True)
+    digest = hashlib.sha256()
+    for part in (hashlib.sha256(user_photo).digest(), hashlib.sha256(product_image).digest(), params.encode('utf-8')):
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def lookup(key: str):
+    """Return the cached CDN URL for `key`, or None on a miss. Bumps LRU order on hits."""
+    entry = TryOnCache.query.filter_by(cache_key=key).first()
+    now = datetime.utcnow()
+
+    if entry and entry.created_at < now - _max_age():
+        db.session.delete(entry)
+        db.session.commit()
+        entry = None
+
+    if not entry:
+        _count('misses')
+        return None
+
+    entry.last_used_at = now
+    entry.hit_count = (entry.hit_count or 0) + 1
+    db.session.commit()
+    _count('hits')
+    return entry.cdn_url
+
+
+def _max_age() -> timedelta:
+    return min(timedelta(seconds=Config.TRYON_CACHE_TTL_SECONDS), CDN_URL_LIFETIME - CDN_EXPIRY_MARGIN)
+
+
+def store(key: str, cdn_url: str):
+    """Insert or refresh a cache entry, then evict least recently used entries over the limit."""
+    now = datetime.utcnow()
+    entry = TryOnCache.query.filter_by(cache_key=key).first()
+    if entry:
+        entry.cdn_url = cdn_url
+        entry.created_at = now
+        entry.last_used_at = now
+    else:
+        db.session.add(TryOnCache(cache_key=key, cdn_url=cdn_url, created_at=now, last_used_at=now))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same inputs first
+        db.session.rollback()
+        return
+    _count('stores')
+    _evict()
+
+
+def _evict():
+    excess = TryOnCache.query.count() - Config.TRYON_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+    oldest = db.session.query(TryOnCache.id).order_by(TryOnCache.last_used_at.asc()).limit(excess).subquery()
+    deleted = TryOnCache.query.filter(TryOnCache.id.in_(db.select(oldest.c.id))).delete(synchronize_session=False)
+    db.session.commit()
+    _count('evictions', deleted)
+
+
+def _count(name: str, amount: int = 1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_stats() -> dict:
+    """Hit/miss counters for this process plus the current number of entries."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hitRate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['entries'] = TryOnCache.query.count()
+    return stats
@@ -0,0 +1,286 @@
+"""
+Background job queue for AI try-on generation.
+
+`POST /api/tryon/generate` stores the inputs, inserts a queued TryOn row and
+hands the id to this module. A small pool of worker threads submits the job
+to FASHN, so request workers are never blocked on the model.
+Once submitted, the prediction is handed to services.tryon_poller and the
+worker thread is released until the poller reports the outcome.
+Job state lives on the TryOn row: a worker claims a job by taking a lease
+(`heartbeat_at`), and a periodic sweep renews the leases this process holds
+and re-enqueues jobs whose lease expired, so jobs survive restarts and are
+shared safely between processes.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, and_
+from config import Config
+from models import db, TryOn
+
+_app = None
+_executor = None
+_sweeper = None
+_sweeper_lock = threading.Lock()
+_events = weakref.WeakValueDictionary()  # tryon_id -> threading.Event, signalled when the job finishes
+_events_lock = threading.Lock()
+_pending = set()  # ids submitted to this process's pool and not yet picked up
+_pending_lock = threading.Lock()
+_active = set()  # ids claimed by this process and not finished; their leases are renewed by the sweep
+
+USER_PHOTO_FILE = 'user_photo'
+PRODUCT_IMAGE_FILE = 'product_image'
+
+
+def init_app(app):
+    """
+    Start the worker pool. The sweep that resumes unfinished jobs starts with
+    the first request, so CLI commands and scripts never run it
+    (BACKGROUND_TASKS=false disables it).
+    """
+    global _app, _executor
+    if _executor is not None:
+        return
+    if multiprocessing.parent_process() is not None:
+        # Spawned helper processes (e.g. the image pool) import the app too; they must not run jobs
+        return
+    _app = app
+    _executor = ThreadPoolExecutor(max_workers=Config.TRYON_WORKERS, thread_name_prefix='tryon-worker')
+    if Config.BACKGROUND_TASKS:
+        app.before_request(_start_sweeper)
+
+
+def _start_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        return
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_loop, name='tryon-sweeper', daemon=True)
+            _sweeper.start()
+
+
+def job_dir(tryon_id: int) -> str:
+    return os.path.join(Config.TRYON_JOB_FOLDER, str(tryon_id))
+
+
+def save_job_inputs(tryon_id: int, user_photo: bytes, product_image: bytes):
+    """Persist job inputs to disk so a restarted process can pick the job up."""
+    path = job_dir(tryon_id)
+    os.makedirs(path, exist_ok=True)
+    for name, data in ((USER_PHOTO_FILE, user_photo), (PRODUCT_IMAGE_FILE, product_image)):
+        with open(os.path.join(path, name), 'wb') as f:
+            f.write(data)
+
+
+def load_job_inputs(tryon_id: int):
+    path = job_dir(tryon_id)
+    with open(os.path.join(path, USER_PHOTO_FILE), 'rb') as f:
+        user_photo = f.read()
+    with open(os.path.join(path, PRODUCT_IMAGE_FILE), 'rb') as f:
+        product_image = f.read()
+    return user_photo, product_image
+
+
+def enqueue(tryon_id: int):
+    """Schedule a queued TryOn for processing."""
+    if _executor is None:
+        raise RuntimeError("Try-on job queue is not initialised")
+    with _pending_lock:
+        if tryon_id in _pending:
+            return
+        _pending.add(tryon_id)
+    _executor.submit(_run_job, tryon_id)
+
+
+def wait_for_job(tryon_id: int, timeout: float):
+    """
+    Block for up to `timeout` seconds until the job finishes (long-poll).
+    Jobs run by this process wake the waiter immediately; jobs running in
+    another process are noticed by re-reading the row once a second.
+    """
+    event = _job_event(tryon_id)
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if event.wait(min(remaining, 1.0)):
+            return
+        status = db.session.query(TryOn.status).filter(TryOn.id == tryon_id).scalar()
+        if status in TryOn.FINISHED_STATUSES:
+            return
+
+
+def _job_event(tryon_id: int) -> threading.Event:
+    with _events_lock:
+        event = _events.get(tryon_id)
+        if event is None:
+            event = threading.Event()
+            _events[tryon_id] = event
+        return event
+
+
+def _lease_expired_before() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=Config.TRYON_JOB_LEASE_SECONDS)
+
+
+def _claimable():
+    return or_(
+        TryOn.status == 'queued',
+        and_(
+            TryOn.status == 'processing',
+            or_(TryOn.heartbeat_at.is_(None), TryOn.heartbeat_at < _lease_expired_before())
+        )
+    )
+
+
+def _claim(tryon_id: int) -> bool:
+    """Atomically take the lease on a job. Returns False if someone else holds it."""
+    claimed = TryOn.query.filter(TryOn.id == tryon_id, _claimable()).update({
+        TryOn.status: 'processing',
+        TryOn.heartbeat_at: datetime.utcnow(),
+        TryOn.attempts: TryOn.attempts + 1
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def _run_job(tryon_id: int):
+    with _pending_lock:
+        _pending.discard(tryon_id)
+    with _app.app_context():
+        try:
+            if _claim(tryon_id):
+                _active.add(tryon_id)
+                _process(tryon_id)
+        except Exception:
+            traceback.print_exc()
+            db.session.rollback()
+            _active.discard(tryon_id)
+        finally:
+            db.session.remove()
+
+
+def _process(tryon_id: int):
+    """Submit the job (unless resuming) and hand the prediction to the shared poller."""
+    from services import tryon_poller
+    from services.tryon_service import submit_tryon
+
+    tryon = db.session.get(TryOn, tryon_id)
+    if tryon.attempts > Config.TRYON_JOB_MAX_ATTEMPTS:
+        _finish(tryon, error='Try-on failed after too many attempts')
+        return
+
+    try:
+        if not tryon.prediction_id:
+            user_photo, product_image = load_job_inputs(tryon_id)
+            tryon.prediction_id = submit_tryon(user_photo, product_image)
+            tryon.submitted_at = datetime.utcnow()
+            tryon.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+    except Exception as e:
+        print(f"ERROR in try-on job {tryon_id}: {str(e)}")
+        traceback.print_exc()
+        db.session.rollback()
+        _finish(tryon, error=f"FASHN try-on failed: {str(e)}")
+        return
+
+    submitted_at = (tryon.submitted_at or datetime.utcnow()).replace(tzinfo=timezone.utc).timestamp()
+    future = tryon_poller.track(tryon.prediction_id, submitted_at)
+    # The worker thread is released here; completion is handled when the poller resolves
+    future.add_done_callback(lambda f: _executor.submit(_complete_job, tryon_id, f))
+
+
+def _complete_job(tryon_id: int, future):
+    from services import tryon_cache
+
+    with _app.app_context():
+        try:
+            tryon = db.session.get(TryOn, tryon_id)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"ERROR in try-on job {tryon_id}: {str(e)}")
+                _finish(tryon, error=f"FASHN try-on failed: {str(e)}")
+                return
+
+            timings = json.loads(tryon.timings) if tryon.timings else {}
+            if tryon.submitted_at and tryon.created_at:
+                timings['queue'] = round((tryon.submitted_at - tryon.created_at).total_seconds(), 2)
+            timings['processing'] = result['processing_seconds']
+            timings['polls'] = result['polls']
+            tryon.timings = json.dumps(timings)
+
+            _finish(tryon, cdn_url=result['cdn_url'])
+            if tryon.cache_key:
+                try:
+                    tryon_cache.store(tryon.cache_key, result['cdn_url'])
+                except Exception as e:
+                    print(f"Failed to cache try-on {tryon_id}: {str(e)}")
+                    db.session.rollback()
+        except Exception:
+            traceback.print_exc()
+            db.session.rollback()
+        finally:
+            _active.discard(tryon_id)
+            db.session.remove()
+
+
+def _finish(tryon: TryOn, cdn_url: str = None, error: str = None):
+    tryon.status = 'failed' if error else 'completed'
+    tryon.cdn_url = cdn_url
+    tryon.error = error
+    tryon.completed_at = datetime.utcnow()
+    db.session.commit()
+    _active.discard(tryon.id)
+
+    shutil.rmtree(job_dir(tryon.id), ignore_errors=True)
+    with _events_lock:
+        event = _events.get(tryon.id)
+    if event is not None:
+        event.set()
+
+
+def _heartbeat_active_jobs():
+    """Renew the lease on every job this process is still waiting on."""
+    ids = list(_active)
+    if not ids:
+        return
+    with _app.app_context():
+        try:
+            TryOn.query.filter(TryOn.id.in_(ids), TryOn.status == 'processing').update(
+                {TryOn.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def _resume_jobs():
+    """Enqueue every unfinished job whose lease is free (new or abandoned)."""
+    with _app.app_context():
+        try:
+            ids = [row.id for row in TryOn.query.with_entities(TryOn.id).filter(_claimable()).all()]
+        finally:
+            db.session.remove()
+    for tryon_id in ids:
+        enqueue(tryon_id)
+
+
+def _sweep_loop():
+    while True:
+        try:
+            _heartbeat_active_jobs()
+            _resume_jobs()
+        except Exception as e:
+            print(f"Try-on job sweep failed: {str(e)}")
+        # Run often enough that active leases never lapse
+        time.sleep(Config.TRYON_JOB_LEASE_SECONDS / 3)
@@ -0,0 +1,179 @@
+"""
+Shared FASHN status poller.
+
+Instead of one thread per job sleeping in a fixed 2-second loop, every
+outstanding prediction is registered here and a single thread checks
+whatever is due each tick (FASHN has no multi-id status call, so due jobs
+are checked with concurrent requests over the pooled connection, and each
+is rescheduled as soon as its own check returns).
+
+Poll times adapt to the completion times observed so far: nothing is
+checked before the fastest ~10% of jobs usually finish, polling is dense
+between the 10th and 90th percentile, and it backs off after that.
+"""
+import heapq
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import Config
+
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 5.0
+MIN_SAMPLES = 10  # Below this many observations fall back to a fixed schedule
+DEFAULT_FIRST_POLL = 5.0
+
+_cond = threading.Condition()
+_heap = []  # (next_poll_at, prediction_id)
+_tracked = {}  # prediction_id -> _Tracked
+_durations = deque(maxlen=500)  # seconds from submission to completion
+_thread = None
+_check_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fashn-poll')
+
+
+class _Tracked:
+    def __init__(self, submitted_at: float):
+        self.future = Future()
+        self.submitted_at = submitted_at
+        self.polls = 0
+
+
+def track(prediction_id: str, submitted_at: float = None) -> Future:
+    """
+    Start tracking a FASHN prediction. `submitted_at` is a time.time()
+    timestamp (defaults to now). The returned Future resolves to
+    {'cdn_url', 'polls', 'processing_seconds'} or raises on failure/timeout.
+    """
+    global _thread
+    with _cond:
+        tracked = _tracked.get(prediction_id)
+        if tracked is not None:
+            return tracked.future
+        tracked = _Tracked(submitted_at or time.time())
+        _tracked[prediction_id] = tracked
+        heapq.heappush(_heap, (_next_poll_at(tracked), prediction_id))
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name='fashn-poller', daemon=True)
+            _thread.start()
+        _cond.notify()
+        return tracked.future
+
+
+def get_stats() -> dict:
+    with _cond:
+        durations = list(_durations)
+        outstanding = len(_tracked)
+    stats = {'outstanding': outstanding, 'samples': len(durations)}
+    if len(durations) >= 2:
+        deciles = statistics.quantiles(durations, n=10)
+        stats.update({'p10': round(deciles[0], 2), 'p50': round(deciles[4], 2), 'p90': round(deciles[8], 2)})
+    return stats
+
+
+def _estimates():
+    """(p10, p90) of observed completion times, or None with too few samples."""
+    if len(_durations) < MIN_SAMPLES:
+        return None
+    deciles = statistics.quantiles(_durations, n=10)
+    return deciles[0], deciles[8]
+
+
+def _next_poll_at(tracked: _Tracked) -> float:
+    now = time.time()
+    elapsed = now - tracked.submitted_at
+    estimates = _estimates()
+
+    if estimates is None:
+        interval = DEFAULT_FIRST_POLL if tracked.polls == 0 else 2.0
+    else:
+        p10, p90 = estimates
+        if elapsed < p10:
+            # Almost nothing finishes this early: first check at the 10th percentile
+            interval = p10 - elapsed
+        elif elapsed < p90:
+            interval = MIN_INTERVAL
+        else:
+            # Slow tail: back off gradually past the 90th percentile
+            interval = min(MIN_INTERVAL + (elapsed - p90) / 4, MAX_INTERVAL)
+
+    return now + max(MIN_INTERVAL, min(interval, MAX_INTERVAL * 4))
+
+
+def _loop():
+    while True:
+        with _cond:
+            while not _heap or _heap[0][0] > time.time():
+                _cond.wait(timeout=(_heap[0][0] - time.time()) if _heap else None)
+            due = []
+            while _heap and _heap[0][0] <= time.time():
+                _, prediction_id = heapq.heappop(_heap)
+                if prediction_id in _tracked:
+                    due.append(prediction_id)
+
+        # Checked concurrently; each job is handled (and rescheduled) as soon as its own
+        # check returns, so one slow status call does not hold back the others
+        for prediction_id in due:
+            future = _check_executor.submit(_check, prediction_id)
+            future.add_done_callback(lambda f, prediction_id=prediction_id: _on_checked(prediction_id, f))
+
+
+def _on_checked(prediction_id: str, check: Future):
+    # Exceptions raised in a done-callback are swallowed; fail the job so its waiter is released
+    try:
+        _handle(prediction_id, *check.result())
+    except Exception as e:
+        print(f"FASHN status handling failed for {prediction_id}: {str(e)}")
+        _fail(prediction_id, e)
+
+
+def _fail(prediction_id: str, error: Exception):
+    with _cond:
+        tracked = _tracked.pop(prediction_id, None)
+    if tracked is not None and not tracked.future.done():
+        tracked.future.set_exception(error)
+
+
+def _check(prediction_id: str):
+    from services.tryon_service import get_tryon_status
+    try:
+        return 'ok', get_tryon_status(prediction_id)
+    except Exception as e:
+        return 'error', e
+
+
+def _handle(prediction_id: str, outcome: str, value):
+    with _cond:
+        tracked = _tracked.get(prediction_id)
+        if tracked is None:
+            return
+        tracked.polls += 1
+        elapsed = time.time() - tracked.submitted_at
+
+        result = None
+        error = None
+        if outcome == 'error':
+            error = value
+        elif value.get('status') == 'completed':
+            output = value.get('output')
+            if output:
+                result = {'cdn_url': output[0], 'polls': tracked.polls, 'processing_seconds': round(elapsed, 2)}
+                _durations.append(elapsed)
+            else:
+                error = Exception("No output image URL returned")
+        elif value.get('status') == 'failed':
+            error = Exception(f"FASHN try-on failed: {value.get('error', 'Unknown error')}")
+        elif elapsed > Config.TRYON_POLL_TIMEOUT_SECONDS:
+            error = Exception(f"Try-on timed out after {Config.TRYON_POLL_TIMEOUT_SECONDS} seconds")
+
+        if result is None and error is None:
+            # Still queued or processing
+            heapq.heappush(_heap, (_next_poll_at(tracked), prediction_id))
+            _cond.notify()
+            return
+        del _tracked[prediction_id]
+
+    if error is not None:
+        tracked.future.set_exception(error)
+    else:
+        tracked.future.set_result(result)
@@ -1,7 +1,6 @@
 import base64
-import requests
-import time
 from config import Config
+from services import http_client
 import os
 from PIL import Image
 import io
@@ -12,6 +11,14 @@ if not Config.FASHN_API_KEY:
     raise RuntimeError("FASHN_API_KEY is not set. Add it to your .env or environment.")
 
 FASHN_API_BASE = "https://api.fashn.ai/v1"
+FASHN_MODEL_NAME = "tryon-v1.6"
+FASHN_SUBMIT_TIMEOUT = (5, 60)  # Request bodies carry both images base64-encoded
+FASHN_STATUS_TIMEOUT = (5, 15)
+FASHN_OPTIONS = {
+    "category": "auto",
+    "mode": "balanced",
+    "output_format": "png"
+}
 
 
 def base64_to_image(base64_str: str) -> bytes:
@@ -22,93 +29,81 @@ def image_to_base64(image_data: bytes) -> str:
     """Convert image bytes to base64 string."""
     return base64.b64encode(image_data).decode("utf-8")
 
+def _fashn_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {Config.FASHN_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+def submit_tryon(user_photo: bytes, product_image: bytes) -> str:
+    """
+    Submit a try-on request to the FASHN API.
+    Returns the FASHN prediction id; use wait_for_tryon() to collect the result.
+    """
+    # Convert bytes to base64 with proper prefix
+    user_photo_base64 = f"data:image/jpeg;base64,{image_to_base64(user_photo)}"
+    product_image_base64 = f"data:image/jpeg;base64,{image_to_base64(product_image)}"
+
+    payload = {
+        "model_name": FASHN_MODEL_NAME,
+        "inputs": {
+            "model_image": user_photo_base64,
+            "garment_image": product_image_base64,
+            **FASHN_OPTIONS
+        }
+    }
+
+    print("Submitting try-on request to FASHN API...")
+    response = http_client.post(
+        f"{FASHN_API_BASE}/run",
+        headers=_fashn_headers(),
+        json=payload,
+        timeout=FASHN_SUBMIT_TIMEOUT
+    )
+
+    if response.status_code != 200:
+        raise Exception(f"FASHN API request failed: {response.status_code} - {response.text}")
+
+    result = response.json()
+    prediction_id = result.get("id")
+
+    if not prediction_id:
+        raise Exception(f"No prediction ID returned: {result}")
+
+    print(f"Prediction ID: {prediction_id}")
+    return prediction_id
+
+def get_tryon_status(prediction_id: str) -> dict:
+    """Fetch the raw FASHN status payload for a prediction."""
+    status_response = http_client.get(
+        f"{FASHN_API_BASE}/status/{prediction_id}",
+        headers=_fashn_headers(),
+        timeout=FASHN_STATUS_TIMEOUT
+    )
+
+    if status_response.status_code != 200:
+        raise Exception(f"Status check failed: {status_response.status_code}")
+
+    return status_response.json()
+
 def generate_tryon(user_photo: bytes, product_image: bytes, product_name: str) -> dict:
     """
     Use FASHN Virtual Try-On v1.6 API to generate realistic try-on image.
+    Blocks until the result is ready; request handlers should enqueue a job
+    through services.tryon_jobs instead.
     Returns dict with 'cdn_url' (the FASHN CDN URL) and optionally 'image_data' (bytes).
     """
+    from services import tryon_poller
+
     try:
-        # Convert bytes to base64 with proper prefix
-        user_photo_base64 = f"data:image/jpeg;base64,{image_to_base64(user_photo)}"
-        product_image_base64 = f"data:image/jpeg;base64,{image_to_base64(product_image)}"
-        
-        # Submit try-on request
-        headers = {
-            "Authorization": f"Bearer {Config.FASHN_API_KEY}",
-            "Content-Type": "application/json"
+        prediction_id = submit_tryon(user_photo, product_image)
+        result = tryon_poller.track(prediction_id).result()
+        print(f"Try-on completed. CDN URL: {result['cdn_url']}")
+        return {
+            'cdn_url': result['cdn_url'],
+            'image_data': None  # We won't download by default
         }
-        
-        payload = {
-            "model_name": "tryon-v1.6",
-            "inputs": {
-                "model_image": user_photo_base64,
-                "garment_image": product_image_base64,
-                "category": "auto",
-                "mode": "balanced",
-                "output_format": "png"
-            }
-        }
-        
-        # Submit request
-        print("Submitting try-on request to FASHN API...")
-        response = requests.post(
-            f"{FASHN_API_BASE}/run",
-            headers=headers,
-            json=payload
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"FASHN API request failed: {response.status_code} - {response.text}")
-        
-        result = response.json()
-        prediction_id = result.get("id")
-        
-        if not prediction_id:
-            raise Exception(f"No prediction ID returned: {result}")
-        
-        print(f"Prediction ID: {prediction_id}")
-        
-        # Poll for completion
-        status_url = f"{FASHN_API_BASE}/status/{prediction_id}"
-        max_attempts = 60  # 60 attempts * 2 seconds = 2 minutes max
-        attempt = 0
-        
-        while attempt < max_attempts:
-            time.sleep(2)  # Wait 2 seconds between polls
-            attempt += 1
-            
-            status_response = requests.get(status_url, headers=headers)
-            
-            if status_response.status_code != 200:
-                raise Exception(f"Status check failed: {status_response.status_code}")
-            
-            status_result = status_response.json()
-            status = status_result.get("status")
-            
-            print(f"Attempt {attempt}: Status = {status}")
-            
-            if status == "completed":
-                output = status_result.get("output")
-                if not output or len(output) == 0:
-                    raise Exception("No output image URL returned")
-                
-                # Return the CDN URL directly (for deployment)
-                cdn_url = output[0]
-                print(f"Try-on completed. CDN URL: {cdn_url}")
-                
-                return {
-                    'cdn_url': cdn_url,
-                    'image_data': None  # We won't download by default
-                }
-            
-            elif status == "failed":
-                error = status_result.get("error", "Unknown error")
-                raise Exception(f"FASHN try-on failed: {error}")
-            
-            # Status is still "processing" or "queued", continue polling
-        
-        raise Exception("Try-on timed out after 2 minutes")
-    
+
     except Exception as e:
         print(f"ERROR in generate_tryon: {str(e)}")
         traceback.print_exc()
@@ -116,7 +111,7 @@ def generate_tryon(user_photo: bytes, product_image: bytes, product_name: str) -
 
 def download_tryon_image(cdn_url: str) -> bytes:
     """Download try-on image from CDN URL."""
-    response = requests.get(cdn_url)
+    response = http_client.get(cdn_url)
     if response.status_code != 200:
         raise Exception(f"Failed to download result image: {response.status_code}")
     return response.content
@@ -127,4 +122,4 @@ def save_tryon_image(image_data: bytes, filename: str) -> str:
     filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
     with open(filepath, 'wb') as f:
         f.write(image_data)
-    return filepath
\ No newline at end of file
+    return filepath
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Configure before config.py is imported: throwaway SQLite file, no sweeper threads, cheap bcrypt
+_db_dir = tempfile.mkdtemp(prefix='valorfit-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['BACKGROUND_TASKS'] = 'false'
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+os.environ.setdefault('FASHN_API_KEY', 'test-key')  # Checked at import; never called
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app as flask_app  # noqa: E402
+from models import db  # noqa: E402
+from services import catalog_cache  # noqa: E402
+from utils import identity  # noqa: E402
+from flask.testing import FlaskClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+
+class RequestClient(FlaskClient):
+    """Runs each request in its own app context, as in production, so `g` and the session do not leak from the test."""
+
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def app():
+    # Every test recreates the database with the same ids, so process-wide caches must start empty
+    with identity._cache_lock:
+        identity._cache.clear()
+    catalog_cache.invalidate()
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    app.test_client_class = RequestClient
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Call the returned function with a callable; returns how many SQL statements it ran."""
+    def count(fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        return len(statements)
+    return count
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user with the given role; the password hash is a placeholder (tests use tokens)."""
+    from models import User
+    created = []
+
+    def make(role='customer', name=None):
+        n = len(created) + 1
+        user = User(name=name or f'{role.title()} {n}', email=f'{role}{n}@example.com', password_hash='-', role=role)
+        db.session.add(user)
+        db.session.commit()
+        created.append(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def auth_header(app):
+    from flask_jwt_extended import create_access_token
+
+    def header(user):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    return header
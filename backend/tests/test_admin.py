@@ -0,0 +1,63 @@
+from datetime import date
+from models import db, Design, Order, Product, SalesRollup
+
+
+def _designer_with_sales(make_user, units):
+    designer = make_user('designer')
+    product = Product(name=f'Tee by {designer.name}', price=25.0, image='/api/uploads/tee.png', category='designer',
+                      designer_id=designer.id, designer_name=designer.name)
+    db.session.add(product)
+    db.session.flush()
+    db.session.add(Design(name='Art', designer_id=designer.id, image='/api/uploads/art.png', product_id=product.id))
+    db.session.add(SalesRollup(day=date(2026, 1, 1), designer_id=designer.id, product_id=product.id,
+                               units=units, delivered_units=units, revenue=25.0 * units, commission=1.25 * units,
+                               delivered_commission=1.25 * units))
+    db.session.commit()
+
+
+def test_get_designers_query_count_is_constant(client, make_user, auth_header, count_queries):
+    header = auth_header(make_user('admin'))
+
+    def fetch(expected):
+        def get():
+            response = client.get('/api/admin/designers?sort=sales&order=desc', headers=header)
+            assert response.status_code == 200
+            assert len(response.get_json()['designers']) == expected
+        return count_queries(get)
+
+    _designer_with_sales(make_user, 1)
+    fetch(1)  # Warms the identity cache behind the admin check
+    few = fetch(1)
+    for units in range(2, 21):
+        _designer_with_sales(make_user, units)
+    many = fetch(20)
+
+    assert few == many
+
+
+def test_designer_earnings_count_delivered_orders_only(client, make_user, auth_header):
+    header = auth_header(make_user('admin'))
+    designer = make_user('designer')
+    product = Product(name='Tee', price=40.0, image='/api/uploads/tee.png', category='designer',
+                      quantity=10, designer_id=designer.id, designer_name=designer.name)
+    db.session.add(product)
+    db.session.commit()
+
+    def designer_row():
+        response = client.get('/api/admin/designers', headers=header)
+        return next(d for d in response.get_json()['designers'] if d['id'] == str(designer.id))
+
+    response = client.post('/api/orders', json={'items': [{'productId': product.id, 'quantity': 2}]},
+                           headers=auth_header(make_user('customer')))
+    assert response.status_code == 201
+    order_id = Order.query.one().id
+    assert designer_row()['totalSales'] == 0
+    assert designer_row()['totalEarnings'] == 0
+
+    for status in ('shipped', 'delivered'):
+        assert client.put(f'/api/orders/{order_id}/status', json={'status': status}, headers=header).status_code == 200
+    row = designer_row()
+    assert row['totalSales'] == 2
+    assert row['totalEarnings'] == 4.0
+    db.session.refresh(designer)
+    assert row['walletBalance'] == designer.wallet_balance
@@ -0,0 +1,29 @@
+from models import db, Design
+
+
+def test_admin_design_listing_query_count_is_constant(client, make_user, auth_header, count_queries):
+    header = auth_header(make_user('admin'))
+
+    def add_designs(count):
+        for _ in range(count):
+            designer = make_user('designer')
+            db.session.add(Design(name='Art', designer_id=designer.id, image='/api/uploads/art.png'))
+        db.session.commit()
+        db.session.expire_all()  # Designers must not be served from the identity map
+
+    def fetch(expected):
+        def get():
+            response = client.get('/api/designs', headers=header)
+            assert response.status_code == 200
+            designs = response.get_json()['designs']
+            assert len(designs) == expected
+            assert all(d['designerName'] for d in designs)
+        return count_queries(get)
+
+    add_designs(2)
+    fetch(2)  # Warms the identity cache behind the admin check
+    few = fetch(2)
+    add_designs(30)
+    many = fetch(32)
+
+    assert few == many
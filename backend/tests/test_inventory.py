@@ -0,0 +1,75 @@
+import threading
+from models import db, Product, InventoryHold, ProductStockShard
+from services import inventory
+
+THREADS = 30
+STOCK = 20
+
+
+def _product(quantity):
+    product = Product(name='Drop tee', price=30.0, image='/api/uploads/tee.png', category='normal', quantity=quantity)
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+def _hammer(app, product_id, user_id):
+    """Run THREADS concurrent reserve+commit checkouts of one unit; returns the number sold."""
+    sold = []
+    start = threading.Barrier(THREADS)
+
+    def checkout(order_id):
+        with app.app_context():
+            start.wait()
+            try:
+                reservation_id = inventory.reserve(user_id, {product_id: 1})
+                inventory.commit(reservation_id, order_id)
+                db.session.commit()
+                sold.append(order_id)
+            except inventory.InventoryError:
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=checkout, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(sold)
+
+
+def test_concurrent_reserves_never_oversell(app):
+    product = _product(STOCK)
+
+    assert _hammer(app, product.id, user_id=1) == STOCK
+    db.session.expire_all()
+    assert db.session.get(Product, product.id).quantity == 0
+    assert InventoryHold.query.filter_by(status='committed').count() == STOCK
+
+
+def test_concurrent_reserves_on_shards_never_oversell(app):
+    product = _product(STOCK)
+    inventory.set_shards(product, 4)
+    db.session.commit()
+
+    assert _hammer(app, product.id, user_id=1) == STOCK
+    db.session.expire_all()
+    shards = ProductStockShard.query.filter_by(product_id=product.id).all()
+    assert len(shards) == 4
+    assert all(shard.quantity == 0 for shard in shards)
+    assert inventory.available(db.session.get(Product, product.id)) == 0
+
+
+def test_release_returns_units_to_their_shard(app):
+    product = _product(8)
+    inventory.set_shards(product, 2)
+    db.session.commit()
+
+    reservation_id = inventory.reserve(1, {product.id: 3})
+    db.session.commit()
+    assert inventory.available(product) == 5
+
+    assert inventory.release(reservation_id) > 0
+    db.session.commit()
+    assert inventory.available(product) == 8
@@ -0,0 +1,33 @@
+from models import db, Product, OrderItem
+
+
+def _designer_products(designer, count):
+    products = [
+        Product(name=f'Tee {i}', price=20.0 + i, image='/api/uploads/tee.png', category='designer',
+                quantity=50, designer_id=designer.id, designer_name=designer.name)
+        for i in range(count)
+    ]
+    db.session.add_all(products)
+    db.session.commit()
+    return [p.id for p in products]
+
+
+def test_create_order_query_count_is_constant(client, make_user, auth_header, count_queries):
+    customer = make_user('customer')
+    header = auth_header(customer)
+    designers = [make_user('designer') for _ in range(8)]
+
+    def checkout(product_ids):
+        items = [{'productId': pid, 'quantity': 2} for pid in product_ids]
+
+        def post():
+            response = client.post('/api/orders', json={'items': items, 'paymentMethod': 'card'}, headers=header)
+            assert response.status_code == 201
+        return count_queries(post)
+
+    # One designer product per designer, so line items, earnings and rollups all grow with the cart
+    small = checkout([_designer_products(designers[0], 1)[0]])
+    large = checkout([_designer_products(d, 1)[0] for d in designers])
+
+    assert small == large
+    assert OrderItem.query.count() == 9
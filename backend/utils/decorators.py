@@ -1,7 +1,7 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from models import User
+from flask_jwt_extended import verify_jwt_in_request
+from utils.identity import get_role
 
 def role_required(*roles):
     """Decorator to require specific roles for an endpoint."""
@@ -9,13 +9,13 @@ def role_required(*roles):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            # From the cached identity, so demotions apply within IDENTITY_CACHE_TTL
+            role = get_role()
             
-            if not user:
+            if role is None:
                 return jsonify({'message': 'User not found'}), 404
             
-            if user.role not in roles:
+            if role not in roles:
                 return jsonify({'message': 'Access denied. Insufficient permissions.'}), 403
             
             return fn(*args, **kwargs)
@@ -0,0 +1,75 @@
+"""
+Current-user helpers shared by the auth decorators and routes.
+
+- get_current_user() loads the JWT's user at most once per request (kept on `g`).
+- get_identity() returns (id, role, name) without loading the full row, from
+  a short-lived process-wide cache (IDENTITY_CACHE_TTL), so role checks
+  usually need no query. The cache entry is dropped whenever the user row is
+  updated or deleted in this process; other processes see a role change
+  within IDENTITY_CACHE_TTL seconds. Roles always come from the database,
+  never from the (long-lived) access token.
+"""
+import threading
+from collections import namedtuple
+from cachetools import TTLCache
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from config import Config
+from models import db, User
+
+Identity = namedtuple('Identity', ['id', 'role', 'name'])
+
+_cache = TTLCache(maxsize=Config.IDENTITY_CACHE_SIZE, ttl=Config.IDENTITY_CACHE_TTL)
+_cache_lock = threading.Lock()
+_MISSING = object()
+
+
+def get_current_user():
+    """The authenticated User for this request, or None if it no longer exists."""
+    user = g.get('_current_user', _MISSING)
+    if user is _MISSING:
+        user = User.query.get(get_jwt_identity())
+        g._current_user = user
+        if user is not None:
+            _remember(user)
+    return user
+
+
+def get_identity():
+    """(id, role, name) of the authenticated user, or None if it no longer exists."""
+    user = g.get('_current_user', _MISSING)
+    if user is not _MISSING:
+        return Identity(user.id, user.role, user.name) if user else None
+
+    user_id = int(get_jwt_identity())
+    with _cache_lock:
+        identity = _cache.get(user_id)
+    if identity is None:
+        user = get_current_user()
+        if user is None:
+            return None
+        identity = Identity(user.id, user.role, user.name)
+    return identity
+
+
+def get_role():
+    """Current role of the authenticated user, or None if it no longer exists."""
+    identity = get_identity()
+    return identity.role if identity else None
+
+
+def invalidate(user_id: int):
+    with _cache_lock:
+        _cache.pop(int(user_id), None)
+
+
+def _remember(user: User):
+    with _cache_lock:
+        _cache[user.id] = Identity(user.id, user.role, user.name)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, user):
+    invalidate(user.id)
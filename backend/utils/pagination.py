@@ -0,0 +1,74 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, literal
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values) -> str:
+    """Encode the sort-key values of the last row on a page as an opaque cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    """Decode a cursor produced by encode_cursor for the given sort columns."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor('Invalid cursor')
+
+    decoded = []
+    for (column, _direction), value in zip(columns, values):
+        if value is not None and column.type.python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                raise InvalidCursor('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+
+def order_by_clauses(columns):
+    return [column.desc() if direction == 'desc' else column.asc() for column, direction in columns]
+
+
+def keyset_filter(columns, values):
+    """
+    Rows strictly after `values` in the ordering given by `columns`
+    ([(column, 'asc'|'desc'), ...]). Expands to
+    (a > x) OR (a = x AND b > y) OR ... so mixed directions work on any database.
+    """
+    # Bind as typed literals so boolean sort keys can be range-compared too
+    values = [literal(v, column.type) for (column, _d), v in zip(columns, values)]
+    clauses = []
+    for i, ((column, direction), value) in enumerate(zip(columns, values)):
+        equal_prefix = [c == v for (c, _d), v in zip(columns[:i], values[:i])]
+        after = column < value if direction == 'desc' else column > value
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, cursor: str = None, limit: int = 24):
+    """
+    Apply ordering, the cursor position and the page size to `query`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(cursor, columns)))
+    rows = query.order_by(*order_by_clauses(columns)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _direction in columns])
+    return rows, next_cursor
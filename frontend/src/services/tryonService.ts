@@ -4,9 +4,46 @@ import { API_BASE } from "@/config/api";
 export type TryOnResponse = {
   image_url?: string;
   tryon_id?: number;
+  job_id?: number;
+  status?: "queued" | "processing" | "completed" | "failed";
+  error?: string;
   message?: string;
 };
 
+// How long each job status request may be held open by the server (seconds).
+// Kept short: a waiting request occupies a server worker.
+const JOB_WAIT_SECONDS = 2;
+// Pause between status requests, growing from the first to the max (milliseconds).
+const JOB_POLL_INITIAL_MS = 1000;
+const JOB_POLL_MAX_MS = 5000;
+// Overall limit before giving up on a try-on job (milliseconds).
+const JOB_TIMEOUT_MS = 3 * 60 * 1000;
+
+async function parseJson(res: Response): Promise<any> {
+  const text = await res.text();
+  try { return JSON.parse(text); } catch { return text; }
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Polls a queued try-on job, backing off between requests, until it completes or fails.
+async function waitForTryOnJob(jobId: number, token: string): Promise<TryOnResponse> {
+  const deadline = Date.now() + JOB_TIMEOUT_MS;
+  let delay = JOB_POLL_INITIAL_MS;
+  while (Date.now() < deadline) {
+    const res = await fetch(`${API_BASE}/api/tryon/jobs/${jobId}?wait=${JOB_WAIT_SECONDS}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    const json = await parseJson(res);
+    if (!res.ok) throw new Error(json?.message || json?.error || "Try-on failed");
+    if (json.status === "completed") return json;
+    if (json.status === "failed") throw new Error(json.error || "Try-on failed");
+    await sleep(delay);
+    delay = Math.min(delay * 1.5, JOB_POLL_MAX_MS);
+  }
+  throw new Error("Try-on timed out");
+}
+
 // Generates a try-on image for the selected product and user photo.
 export async function generateTryOn(
   userPhotoFile: File,
@@ -25,12 +62,11 @@ export async function generateTryOn(
     body: formData,
   });
 
-  const text = await res.text();
-  let json: any;
-  try { json = JSON.parse(text); } catch { json = text; }
+  const json = await parseJson(res);
 
   if (!res.ok) throw new Error(json?.message || json?.error || "Try-on failed");
-  return json;
+  if (json.status === "completed") return json;
+  return waitForTryOnJob(json.job_id, token);
 }
 
 export async function getTryOnHistory() {
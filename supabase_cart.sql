@@ -0,0 +1,52 @@
+-- =====================================================
+-- Cart Upsert Migration
+-- Run this in Supabase SQL Editor on the project used by backend/app
+-- (expects the existing public.cart_items table)
+-- =====================================================
+
+-- Merge duplicate rows left by the old "insert on every add" endpoint
+WITH merged AS (
+    SELECT user_id, product_id, MIN(id::text) AS keep_id, SUM(quantity) AS quantity
+    FROM public.cart_items
+    GROUP BY user_id, product_id
+    HAVING COUNT(*) > 1
+)
+UPDATE public.cart_items c
+SET quantity = LEAST(m.quantity, 99)
+FROM merged m
+WHERE c.id::text = m.keep_id;
+
+DELETE FROM public.cart_items c
+USING public.cart_items other
+WHERE c.user_id = other.user_id
+  AND c.product_id = other.product_id
+  AND c.id::text > other.id::text;
+
+-- One row per product in a user's cart; also serves the per-user cart lookup
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'cart_items_user_product_key') THEN
+        ALTER TABLE public.cart_items
+            ADD CONSTRAINT cart_items_user_product_key UNIQUE (user_id, product_id);
+    END IF;
+END $$;
+
+-- Add to cart in one statement: insert the line or increase its quantity atomically
+CREATE OR REPLACE FUNCTION public.cart_add_item(
+    p_user_id public.cart_items.user_id%TYPE,
+    p_product_id public.cart_items.product_id%TYPE,
+    p_quantity INTEGER DEFAULT 1
+)
+RETURNS public.cart_items
+LANGUAGE sql
+AS $$
+    INSERT INTO public.cart_items (user_id, product_id, quantity)
+    VALUES (p_user_id, p_product_id, p_quantity)
+    ON CONFLICT (user_id, product_id)
+    DO UPDATE SET quantity = LEAST(public.cart_items.quantity + EXCLUDED.quantity, 99)
+    RETURNING *;
+$$;
+
+-- The function trusts p_user_id, so only the backend (service role) may call it
+REVOKE EXECUTE ON FUNCTION public.cart_add_item FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.cart_add_item TO service_role;